@@ -1,17 +1,32 @@
-"""Agents for house evaluator."""
-
-from .base import get_openrouter_client
-from .vision import VisionAgent
-from .present_fit import PresentFitAgent
-from .potential import PotentialAgent
-from .brief import BriefAgent
-from .orchestrator import Orchestrator
-
-__all__ = [
-    "get_openrouter_client",
-    "VisionAgent",
-    "PresentFitAgent",
-    "PotentialAgent",
-    "BriefAgent",
-    "Orchestrator",
-]
+"""Agents for house evaluator.
+
+Exports are loaded on first access (PEP 562), so importing a single agent
+module such as ``src.agents.base`` doesn't import every other agent.
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    "AgentContext": ".base",
+    "get_openrouter_client": ".base",
+    "VisionAgent": ".vision",
+    "PresentFitAgent": ".present_fit",
+    "PotentialAgent": ".potential",
+    "BriefAgent": ".brief",
+    "Orchestrator": ".orchestrator",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
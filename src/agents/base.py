@@ -1,18 +1,24 @@
 """Base agent setup and shared utilities."""
 
+import asyncio
+import json
 import os
-from functools import lru_cache
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, TypeVar
 
+import orjson
 from agents import Agent, Runner
 from openai import OpenAI
 
+from src.models import House, TasteModel, RoomAnalysis
 from src.storage import JsonStore
-from src.services.openrouter import OpenRouterClient
+from src.services.openrouter import OpenRouterClient, get_openrouter_client
 
 
-@lru_cache()
-def get_openai_client() -> OpenAI:
-    """Get OpenAI client configured for OpenRouter."""
+def create_openai_client() -> OpenAI:
+    """Create an OpenAI client configured for OpenRouter."""
     api_key = os.environ.get("OPENROUTER_API_KEY")
     if not api_key:
         raise ValueError("OPENROUTER_API_KEY environment variable required")
@@ -27,9 +33,86 @@ def get_openai_client() -> OpenAI:
     )
 
 
-def get_openrouter_client() -> OpenRouterClient:
-    """Get OpenRouter client for vision requests."""
-    return OpenRouterClient()
+@dataclass
+class AgentContext:
+    """Resources shared by every agent in a pipeline.
+
+    Built once and injected into each agent, so a set of agents shares one
+    store reference and one set of API clients.
+    """
+
+    store: JsonStore
+    openai: OpenAI
+    openrouter: OpenRouterClient
+
+    @classmethod
+    def create(cls, store: JsonStore) -> "AgentContext":
+        """Build a context around a store with the shared API clients."""
+        return cls(
+            store=store,
+            openai=create_openai_client(),
+            openrouter=get_openrouter_client(),
+        )
+
+
+_FENCE = "```"
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
+
+
+def extract_json(text: str) -> dict:
+    """Extract the first JSON object from a model response.
+
+    Tolerates markdown fences, prose before or after the object, and
+    trailing comments. Raises json.JSONDecodeError if no object is found.
+    """
+    fence = _JSON_FENCE_RE.search(text) if _FENCE in text else None
+    candidates = (fence.group(1), text) if fence else (text,)
+
+    for candidate in candidates:
+        # JSON-mode replies are usually the bare object: parse it in one C call
+        stripped = candidate.strip()
+        if stripped.startswith("{") and stripped.endswith("}"):
+            try:
+                data = orjson.loads(stripped)
+            except orjson.JSONDecodeError:
+                data = None
+            if isinstance(data, dict):
+                return data
+
+        # Otherwise scan for the first decodable object amid prose or comments
+        start = candidate.find("{")
+        while start != -1:
+            try:
+                data, _ = _JSON_DECODER.raw_decode(candidate, start)
+            except json.JSONDecodeError:
+                data = None
+            if isinstance(data, dict):
+                return data
+            start = candidate.find("{", start + 1)
+
+    raise json.JSONDecodeError("No JSON object found", text, 0)
+
+
+def room_fields(room: RoomAnalysis) -> dict:
+    """Template fields for one analyzed room, for per-room context blocks."""
+    return {
+        "room_type": room.room_type,
+        "aesthetic_quality": room.aesthetic_quality,
+        "materials": ", ".join(room.materials),
+        "light_quality": room.light_quality,
+        "condition": room.condition,
+        "notes": room.notes,
+    }
+
+
+def clamp(value: float | str, low: float, high: float) -> float:
+    """Bound a model-reported number to its scale.
+
+    Models sometimes quote numbers ("71"), so the value is converted first;
+    anything non-numeric raises ValueError or TypeError for the caller's fallback.
+    """
+    return min(high, max(low, float(value)))
 
 
 # Default models - using Gemini 3 Flash for best price/performance
@@ -37,6 +120,21 @@ DEFAULT_MODEL = "google/gemini-3-flash-preview"
 VISION_MODEL = "google/gemini-3-flash-preview"
 FAST_MODEL = "google/gemini-2.0-flash-001"
 
+# Temperatures for parallel scoring samples; the first parseable one wins
+SAMPLING_TEMPERATURES = (0.2, 0.5)
+
+# Listing description length included in each agent's prompt context
+DESC_FIT_MAX = 1000
+DESC_BRIEF_MAX = 800
+
+# Raw response kept in fallback results when a reply can't be parsed
+ERR_SNIPPET_MAX = 300
+
+# Built prompt contexts kept per agent, keyed on house file + results + taste version
+CONTEXT_CACHE_SIZE = 256
+
+T = TypeVar("T")
+
 
 class BaseAgent:
     """Base class for house evaluator agents."""
@@ -44,18 +142,107 @@ class BaseAgent:
     name: str = "base"
     instructions: str = "You are a helpful assistant."
     model: str = DEFAULT_MODEL
+    # Mark the system prompt for provider-side prompt caching
+    cache_system: bool = False
+    # Request structured JSON output (response_format=json_object)
+    json_response: bool = False
+
+    def __init__(self, ctx: AgentContext):
+        self.ctx = ctx
+        self.store = ctx.store
+        self.openrouter = ctx.openrouter
+        # Key -> (context, the result objects whose ids are in the key)
+        self._context_cache: OrderedDict[tuple, tuple[str, tuple]] = OrderedDict()
+        self._taste_context: tuple[int, str] | None = None
+
+    def build_context(self, house: House, taste: TasteModel) -> str:
+        """Build the agent's prompt context, reusing it when inputs are unchanged.
+
+        Listing fields are covered by the digest of the house file the store
+        last read or wrote. Results set since then (e.g. vision, mid-pipeline)
+        are frozen and replaced rather than modified, so they are matched by
+        identity without serializing them.
+        """
+        digest = self.store.house_digest(house.id)
+        if digest is None:
+            # Not (yet) stored, so there's nothing cheap to key the listing on
+            return self._build_context(house, taste)
+
+        results = (house.vision_analysis, house.present_fit_score, house.potential_score)
+        key = (house.id, digest, taste.version, *map(id, results))
+        cached = self._context_cache.get(key)
+        if cached is not None:
+            self._context_cache.move_to_end(key)
+            return cached[0]
+
+        context = self._build_context(house, taste)
+        # The results are kept with the entry so their ids can't be reused
+        self._context_cache[key] = (context, results)
+        if len(self._context_cache) > CONTEXT_CACHE_SIZE:
+            self._context_cache.popitem(last=False)
+        return context
 
-    def __init__(self, store: JsonStore):
-        self.store = store
-        self._client = get_openai_client()
-        self._openrouter = None
+    def _build_context(self, house: House, taste: TasteModel) -> str:
+        """Build the prompt context for a house (implemented by subclasses)."""
+        raise NotImplementedError
 
-    @property
-    def openrouter(self) -> OpenRouterClient:
-        """Lazy-load OpenRouter client for vision."""
-        if self._openrouter is None:
-            self._openrouter = get_openrouter_client()
-        return self._openrouter
+    def taste_context(self, taste: TasteModel) -> str:
+        """The taste part of the prompt context, rebuilt only when the taste version changes.
+
+        Every house in a batch shares it, so it is built once per batch
+        instead of once per house, and stays byte-identical across prompts.
+        """
+        if self._taste_context is None or self._taste_context[0] != taste.version:
+            self._taste_context = (taste.version, self._build_taste_context(taste))
+        return self._taste_context[1]
+
+    def _build_taste_context(self, taste: TasteModel) -> str:
+        """Build the taste part of the prompt context (overridden by subclasses)."""
+        return ""
+
+    async def race_completions(
+        self,
+        prompt: str,
+        parse: Callable[[str], T | None],
+        temperatures: tuple[float, ...] = SAMPLING_TEMPERATURES,
+    ) -> tuple[str, T | None]:
+        """Run parallel completions and return the first that parses.
+
+        One request is sent per temperature. As soon as one response parses
+        (``parse`` returns non-None), the rest are cancelled. Returns the
+        winning ``(response, parsed)`` pair, or the last response with
+        ``None`` if no sample parsed.
+        """
+
+        async def sample(temperature: float) -> tuple[str, T | None]:
+            response = await self.openrouter.achat(
+                prompt=prompt,
+                system_prompt=self.instructions,
+                temperature=temperature,
+                cache_system=self.cache_system,
+                json_mode=self.json_response,
+            )
+            return response, parse(response)
+
+        tasks = [asyncio.create_task(sample(t)) for t in temperatures]
+        response = ""
+        error: Exception | None = None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    response, parsed = await next_done
+                except Exception as e:
+                    error = e
+                    continue
+                if parsed is not None:
+                    return response, parsed
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if not response and error is not None:
+            raise error
+        return response, None
 
     def create_agent(self, **kwargs) -> Agent:
         """Create an OpenAI Agent SDK agent."""
@@ -72,9 +259,11 @@ class BaseAgent:
         return result.final_output
 
     def cleanup(self):
-        """Clean up resources."""
-        if self._openrouter:
-            self._openrouter.close()
+        """Clean up resources.
+
+        The OpenRouter client is shared across agents and closed at exit,
+        so there is nothing to release per agent.
+        """
 
 
 # Shared instruction components
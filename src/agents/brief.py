@@ -1,8 +1,9 @@
 """Brief generation agent - synthesizes house analysis into readable brief."""
 
-from src.models import House
-from src.storage import JsonStore
-from .base import BaseAgent, AESTHETIC_CONTEXT, DEFAULT_MODEL
+from typing import Callable
+
+from src.models import House, TasteModel
+from .base import BaseAgent, AESTHETIC_CONTEXT, DEFAULT_MODEL, DESC_BRIEF_MAX
 
 
 BRIEF_INSTRUCTIONS = f"""{AESTHETIC_CONTEXT}
@@ -34,17 +35,69 @@ class BriefAgent(BaseAgent):
     name = "brief_agent"
     model = DEFAULT_MODEL
     instructions = BRIEF_INSTRUCTIONS
+    cache_system = True
 
-    def generate(self, house_id: str) -> str | None:
+    def generate(self, house_id: str, taste: TasteModel | None = None) -> str | None:
         """Generate a brief for a house."""
-        house = self.store.load_house(house_id)
+        prompt = self._prepare(house_id, taste)
+        if prompt is None:
+            return None
+
+        response = self.openrouter.chat(
+            prompt=prompt,
+            system_prompt=self.instructions,
+            cache_system=self.cache_system,
+        )
+
+        return self._save_brief(house_id, response)
+
+    async def agenerate(
+        self,
+        house_id: str,
+        taste: TasteModel | None = None,
+        on_progress: Callable[[int], None] | None = None,
+        house: House | None = None,
+    ) -> str | None:
+        """Async variant of generate.
+
+        The brief is streamed; ``on_progress`` receives the number of
+        characters received after each chunk so callers can show it being
+        written. Only the final text is saved. ``house`` lets the orchestrator
+        pass the copy it already loaded.
+        """
+        prompt = self._prepare(house_id, taste, house)
+        if prompt is None:
+            return None
+
+        chunks = []
+        received = 0
+        async for delta in self.openrouter.astream_chat(
+            prompt=prompt,
+            system_prompt=self.instructions,
+            cache_system=self.cache_system,
+        ):
+            chunks.append(delta)
+            received += len(delta)
+            if on_progress:
+                on_progress(received)
+
+        return self._save_brief(house_id, "".join(chunks))
+
+    def _prepare(
+        self,
+        house_id: str,
+        taste: TasteModel | None = None,
+        house: House | None = None,
+    ) -> str | None:
+        """Load inputs and build the brief prompt."""
+        house = house or self.store.load_house(house_id)
         if not house:
             return None
 
-        taste = self.store.load_or_create_taste()
+        taste = taste or self.store.load_or_create_taste()
 
         # Build context from all available data
-        context = self._build_context(house, taste)
+        context = self.build_context(house, taste)
 
         prompt = f"""Generate a house brief based on this analysis.
 
@@ -63,32 +116,33 @@ Write a clear, honest brief in markdown format with these sections:
 Be direct and helpful. The reader needs to decide whether to pursue this house.
 """
 
-        response = self.openrouter.chat(
-            prompt=prompt,
-            system_prompt=self.instructions,
-        )
+        return prompt
 
-        # Save to house
-        house.brief = response
-        self.store.save_house(house)
-
-        return response
+    def _save_brief(self, house_id: str, brief: str) -> str:
+        """Save the brief onto the house as the store currently holds it
+        (the pending object while saves are deferred).
+        """
+        house = self.store.load_house(house_id)
+        if house:
+            house.brief = brief
+            self.store.save_house(house)
+        return brief
 
     def _build_context(self, house: House, taste) -> str:
         """Build context for brief generation."""
-        context = f"""## House
+        parts = [f"""## House
 Address: {house.address}
-Price: ${house.price:,} if house.price else 'N/A'
-Beds: {house.features.bedrooms} | Baths: {house.features.bathrooms} | Sqft: {house.features.sqft}
+Price: {f'${house.price:,}' if house.price else 'N/A'}
+Beds: {house.bedrooms} | Baths: {house.bathrooms} | Sqft: {house.sqft}
 URL: {house.url}
 
 ## Description
-{house.description[:800] if house.description else 'No description'}
-"""
+{house.description[:DESC_BRIEF_MAX] if house.description else 'No description'}
+"""]
 
         if house.vision_analysis:
             va = house.vision_analysis
-            context += f"""
+            parts.append(f"""
 ## Vision Analysis
 Overall Aesthetic: {va.overall_aesthetic}/10
 Style: {va.architectural_style}
@@ -96,22 +150,22 @@ Renovation State: {va.renovation_state}
 
 Red Flags: {', '.join(va.red_flags) or 'None'}
 Positive Signals: {', '.join(va.positive_signals) or 'None'}
-"""
+""")
 
         if house.present_fit_score:
             pf = house.present_fit_score
-            context += f"""
+            parts.append(f"""
 ## Present-Fit Score: {pf.score:.1f}/100
 Passed: {'Yes' if pf.passed else 'No'}
 Violations: {', '.join(pf.violations) or 'None'}
 Deal-Breakers: {', '.join(pf.deal_breakers) or 'None'}
 
 Justification: {pf.justification}
-"""
+""")
 
         if house.potential_score:
             ps = house.potential_score
-            context += f"""
+            parts.append(f"""
 ## Potential Score: {ps.score:.1f}/100
 Feasibility: {ps.feasibility}
 Cost Class: {ps.cost_class}
@@ -119,14 +173,18 @@ Cost Class: {ps.cost_class}
 Upside: {ps.upside_narrative}
 
 Risks: {', '.join(ps.risk_notes) or 'None'}
-"""
+""")
 
-        context += f"""
+        parts.append(self.taste_context(taste))
+
+        return "".join(parts)
+
+    def _build_taste_context(self, taste: TasteModel) -> str:
+        """Build the key principles part of the brief context."""
+        return f"""
 ## User's Key Principles
 {chr(10).join('- ' + p for p in taste.principles[:5]) or '(not specified)'}
 
 ## User's Anti-Principles
 {chr(10).join('- ' + p for p in taste.anti_principles[:5]) or '(not specified)'}
 """
-
-        return context
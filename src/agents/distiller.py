@@ -1,6 +1,5 @@
 """Distiller agent - regenerates aesthetics.md from taste model."""
 
-from src.storage import JsonStore
 from .base import BaseAgent, DEFAULT_MODEL
 
 
@@ -24,6 +23,7 @@ class DistillerAgent(BaseAgent):
     name = "distiller"
     model = DEFAULT_MODEL
     instructions = DISTILLER_INSTRUCTIONS
+    cache_system = True
 
     def distill(self) -> str:
         """Generate aesthetics.md content from taste model."""
@@ -58,7 +58,7 @@ class DistillerAgent(BaseAgent):
 
 ### Renovation Stance
 - Tolerance: {taste.renovation_tolerance}
-- Max Budget: ${taste.renovation_budget_max:,} if taste.renovation_budget_max else 'Not specified'
+- Max Budget: {f'${taste.renovation_budget_max:,}' if taste.renovation_budget_max else 'Not specified'}
 
 ### Exemplars
 """
@@ -91,6 +91,7 @@ Make it feel personal and useful, not just a data dump.
         response = self.openrouter.chat(
             prompt=prompt,
             system_prompt=self.instructions,
+            cache_system=self.cache_system,
         )
 
         return response
@@ -1,27 +1,60 @@
 """Orchestrator - coordinates agent execution for scoring pipeline."""
 
+import asyncio
+import heapq
+from contextlib import contextmanager
+from operator import itemgetter
+
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import Progress, SpinnerColumn, TaskID, TextColumn
 
+from src.models import House, TasteModel
+from src.services.image_composite import aclose_client
 from src.storage import JsonStore
+from .base import AgentContext
 from .vision import VisionAgent
 from .present_fit import PresentFitAgent
 from .potential import PotentialAgent
 from .brief import BriefAgent
 
 
+# Houses scored at once in batch runs; bounded to stay under OpenRouter rate limits
+DEFAULT_BATCH_CONCURRENCY = 5
+
 console = Console()
 
 
+async def _cancel(task: asyncio.Task):
+    """Cancel a pipeline task and wait for it to unwind."""
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+
+
 class Orchestrator:
     """Coordinates the scoring pipeline for houses."""
 
-    def __init__(self, store: JsonStore):
+    def __init__(self, store: JsonStore, skip_on_fail: bool = True):
+        """Set up the pipeline agents.
+
+        With ``skip_on_fail`` (the default), houses that fail present-fit or
+        hit a deal-breaker skip potential scoring and brief generation.
+        """
         self.store = store
-        self.vision_agent = VisionAgent(store)
-        self.present_fit_agent = PresentFitAgent(store)
-        self.potential_agent = PotentialAgent(store)
-        self.brief_agent = BriefAgent(store)
+        self.skip_on_fail = skip_on_fail
+        self.ctx = AgentContext.create(store)
+        self.vision_agent = VisionAgent(self.ctx)
+        self.present_fit_agent = PresentFitAgent(self.ctx)
+        self.potential_agent = PotentialAgent(self.ctx)
+        self.brief_agent = BriefAgent(self.ctx)
+        # One progress display reused across runs instead of one per house
+        self._progress = Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console,
+        )
 
     def score_house(self, house_id: str) -> bool:
         """Run the full scoring pipeline on a house.
@@ -32,84 +65,192 @@ class Orchestrator:
         3. Potential scoring (renovation opportunities)
         4. Brief generation (synthesize all analysis)
 
+        Steps 3-4 are skipped for hard-failed houses when skip_on_fail is set.
+
         Returns True if pipeline completed successfully.
         """
+        return asyncio.run(self._run_and_close(self.score_house_async(house_id)))
+
+    async def score_house_async(
+        self,
+        house_id: str,
+        taste: TasteModel | None = None,
+        house_task: TaskID | None = None,
+    ) -> bool:
+        """Async scoring pipeline.
+
+        Present-fit and potential only depend on the vision analysis, so they
+        run concurrently once vision completes; the brief waits for both.
+
+        ``taste`` lets batch runs load the taste model once instead of once per
+        agent call. ``house_task`` is the house's row in a batch progress view;
+        when given, every stage reports into that row instead of adding its own.
+        """
         house = self.store.load_house(house_id)
         if not house:
             console.print(f"[red]House not found: {house_id}[/red]")
             return False
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            # Step 1: Vision Analysis
-            task = progress.add_task("Analyzing images...", total=None)
-            try:
-                vision = self.vision_agent.analyze(house_id)
-                if vision:
-                    progress.update(task, description="[green]✓ Vision analysis complete")
-                else:
-                    progress.update(task, description="[yellow]⚠ Vision analysis skipped (no images)")
-            except Exception as e:
-                progress.update(task, description=f"[red]✗ Vision analysis failed: {e}")
-                return False
+        taste = taste or self.store.load_or_create_taste()
+
+        # Agents save after every stage; write the house once at the end instead
+        with self.store.deferred_saves(house_id), self._live_progress() as progress:
+            return await self._run_pipeline(house, taste, progress, house_task)
+
+    @contextmanager
+    def _live_progress(self):
+        """Show the shared progress display for the duration of a run."""
+        if self._progress.live.is_started:
+            yield self._progress
+            return
 
-            # Step 2: Present-Fit Scoring
-            task = progress.add_task("Scoring present-fit...", total=None)
+        self._progress.start()
+        try:
+            yield self._progress
+        finally:
+            self._progress.stop()
+            # Finished rows stay on screen; drop them so the next run starts clean
+            for task_id in list(self._progress.task_ids):
+                self._progress.remove_task(task_id)
+
+    async def _run_pipeline(
+        self,
+        house: House,
+        taste: TasteModel,
+        progress: Progress,
+        house_task: TaskID | None = None,
+    ) -> bool:
+        """Run the pipeline stages, reporting each as a progress task."""
+        house_id = house.id
+        prefix = f"[bold]{house.address}[/bold] " if house_task is not None else ""
+
+        def start(description: str) -> TaskID:
+            if house_task is None:
+                return progress.add_task(description, total=None)
+            progress.update(house_task, description=prefix + description)
+            return house_task
+
+        def finish(task: TaskID, description: str):
+            progress.update(task, description=prefix + description)
+
+        # Step 1: Vision Analysis
+        task = start("Analyzing images...")
+        if not house.has_images:
+            # Nothing to composite or send; record the neutral placeholder directly
+            self.vision_agent.save_placeholder(house)
+            finish(task, "[yellow]⚠ Vision analysis skipped (no images)")
+        else:
             try:
-                fit_score = self.present_fit_agent.score(house_id)
-                if fit_score:
-                    progress.update(
-                        task,
-                        description=f"[green]✓ Present-fit score: {fit_score.score:.1f}",
-                    )
-                else:
-                    progress.update(task, description="[red]✗ Present-fit scoring failed")
-                    return False
+                await self.vision_agent.aanalyze(house_id, house)
+                finish(task, "[green]✓ Vision analysis complete")
             except Exception as e:
-                progress.update(task, description=f"[red]✗ Present-fit failed: {e}")
+                finish(task, f"[red]✗ Vision analysis failed: {e}")
                 return False
 
-            # Step 3: Potential Scoring
-            task = progress.add_task("Evaluating potential...", total=None)
-            try:
-                pot_score = self.potential_agent.score(house_id)
-                if pot_score:
-                    progress.update(
-                        task,
-                        description=f"[green]✓ Potential score: {pot_score.score:.1f}",
-                    )
-                else:
-                    progress.update(task, description="[yellow]⚠ Potential scoring skipped")
-            except Exception as e:
-                progress.update(task, description=f"[yellow]⚠ Potential failed: {e}")
-                # Continue anyway, potential is optional
+        # Steps 2 & 3: Present-Fit and Potential Scoring (concurrent)
+        fit_task = start("Scoring present-fit...")
+        pot_task = start("Evaluating potential...")
+        # Vision set its analysis on this copy, so the scorers can reuse it
+        fit_job = asyncio.create_task(self.present_fit_agent.ascore(house_id, taste, house))
+        pot_job = asyncio.create_task(self.potential_agent.ascore(house_id, taste, house))
 
-            # Step 4: Brief Generation
-            task = progress.add_task("Generating brief...", total=None)
-            try:
-                brief = self.brief_agent.generate(house_id)
-                if brief:
-                    progress.update(task, description="[green]✓ Brief generated")
-                else:
-                    progress.update(task, description="[yellow]⚠ Brief generation skipped")
-            except Exception as e:
-                progress.update(task, description=f"[yellow]⚠ Brief failed: {e}")
-                # Continue anyway, brief is optional
+        try:
+            fit_score = await fit_job
+        except Exception as e:
+            await _cancel(pot_job)
+            finish(fit_task, f"[red]✗ Present-fit failed: {e}")
+            return False
+        if not fit_score:
+            await _cancel(pot_job)
+            finish(fit_task, "[red]✗ Present-fit scoring failed")
+            return False
+        finish(fit_task, f"[green]✓ Present-fit score: {fit_score.score:.1f}")
+        house.present_fit_score = fit_score
+
+        hard_fail = not fit_score.passed or bool(fit_score.deal_breakers)
+        if hard_fail and self.skip_on_fail and not pot_job.done():
+            # Auto-reject: don't spend potential/brief calls on a dead branch
+            await _cancel(pot_job)
+            self._drop_stale_outputs(house, potential=True)
+            finish(pot_task, "[yellow]⏭ Skipping potential/brief (hard fail)")
+            return True
+
+        try:
+            pot_score = await pot_job
+        except Exception as e:
+            finish(pot_task, f"[yellow]⚠ Potential failed: {e}")
+            # Continue anyway, potential is optional
+        else:
+            house.potential_score = pot_score
+            if pot_score:
+                finish(pot_task, f"[green]✓ Potential score: {pot_score.score:.1f}")
+            else:
+                finish(pot_task, "[yellow]⚠ Potential scoring skipped")
+
+        if hard_fail and self.skip_on_fail:
+            self._drop_stale_outputs(house, potential=False)
+            return True
+
+        # Step 4: Brief Generation
+        task = start("Generating brief...")
+
+        def on_brief_progress(chars: int):
+            finish(task, f"Generating brief... ({chars:,} chars)")
+
+        try:
+            brief = await self.brief_agent.agenerate(
+                house_id, taste, on_brief_progress, house=house
+            )
+            if brief:
+                finish(task, "[green]✓ Brief generated")
+            else:
+                finish(task, "[yellow]⚠ Brief generation skipped")
+        except Exception as e:
+            finish(task, f"[yellow]⚠ Brief failed: {e}")
+            # Continue anyway, brief is optional
 
         return True
 
-    def batch_score(self, house_ids: list[str] | None = None) -> dict[str, bool]:
+    def _drop_stale_outputs(self, house: House, potential: bool):
+        """Clear outputs from an earlier run that this skipped run did not redo.
+
+        The agents save onto the house as the store currently holds it (the
+        pending object while saves are deferred), so the clear goes there too.
+        """
+        stored = self.store.load_house(house.id) or house
+        for target in (stored, house):
+            if potential:
+                target.potential_score = None
+            target.brief = ""
+        self.store.save_house(stored)
+
+    async def _run_and_close(self, coro):
+        """Await a pipeline coroutine, then close clients bound to this loop."""
+        async with self:
+            return await coro
+
+    def batch_score(
+        self,
+        house_ids: list[str] | None = None,
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ) -> dict[str, bool]:
         """Score multiple houses.
 
         Args:
             house_ids: List of house IDs to score, or None for all unscored
+            max_concurrency: Maximum number of houses scored at once
 
         Returns:
             Dict mapping house_id to success/failure
         """
+        return asyncio.run(self._run_and_close(self.batch_score_async(house_ids, max_concurrency)))
+
+    async def batch_score_async(
+        self,
+        house_ids: list[str] | None = None,
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ) -> dict[str, bool]:
+        """Score multiple houses concurrently, bounded by a semaphore."""
         if house_ids is None:
             houses = self.store.get_unscored_houses()
             house_ids = [h.id for h in houses]
@@ -120,11 +261,37 @@ class Orchestrator:
 
         console.print(f"[cyan]Scoring {len(house_ids)} houses...[/cyan]\n")
 
-        results = {}
-        for i, house_id in enumerate(house_ids, 1):
-            house = self.store.load_house(house_id)
-            console.print(f"\n[bold]({i}/{len(house_ids)}) {house.address if house else house_id}[/bold]")
-            results[house_id] = self.score_house(house_id)
+        taste = self.store.load_or_create_taste()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        with self._live_progress() as progress:
+            house_tasks = {
+                house_id: progress.add_task(f"[dim]{house_id} queued", total=None)
+                for house_id in house_ids
+            }
+
+            async def score_one(house_id: str) -> tuple[str, bool]:
+                task = house_tasks[house_id]
+                async with semaphore:
+                    try:
+                        ok = await self.score_house_async(house_id, taste, task)
+                    except Exception as e:
+                        progress.update(task, description=f"[red]✗ {house_id}: {e}")
+                        return house_id, False
+
+                scored = self.store.load_house(house_id) if ok else None
+                if scored and scored.present_fit_score:
+                    pot = f"{scored.potential_score.score:.0f}" if scored.potential_score else "-"
+                    progress.update(
+                        task,
+                        description=(
+                            f"[green]✓[/green] [bold]{scored.address}[/bold] "
+                            f"Fit: {scored.present_fit_score.score:.0f} | Potential: {pot}"
+                        ),
+                    )
+                return house_id, ok
+
+            results = dict(await asyncio.gather(*(score_one(h) for h in house_ids)))
 
         # Summary
         success = sum(results.values())
@@ -132,21 +299,33 @@ class Orchestrator:
 
         return results
 
-    def get_rankings(self) -> list[tuple[str, float, float]]:
+    def get_rankings(self, top_k: int | None = None) -> list[tuple[str, float, float]]:
         """Get ranked list of scored houses.
 
         Returns list of (house_id, present_fit_score, potential_score) tuples,
-        sorted by present_fit_score descending.
+        sorted by present_fit_score descending. With ``top_k``, only the best
+        ``top_k`` houses are selected (heap-based, no full sort).
         """
-        houses = self.store.get_scored_houses()
-        rankings = []
+        rankings = (
+            (h.id, h.present_fit_score.score, h.potential_score.score if h.potential_score else 0.0)
+            for h in self.store.list_houses()
+            if h.present_fit_score is not None
+        )
+
+        if top_k is not None:
+            return heapq.nlargest(top_k, rankings, key=itemgetter(1))
+        return sorted(rankings, key=itemgetter(1), reverse=True)
+
+    async def acleanup(self):
+        """Close the shared async clients opened during an event loop run."""
+        await self.ctx.openrouter.aclose()
+        await aclose_client()
 
-        for h in houses:
-            fit = h.present_fit_score.score if h.present_fit_score else 0
-            pot = h.potential_score.score if h.potential_score else 0
-            rankings.append((h.id, fit, pot))
+    async def __aenter__(self):
+        return self
 
-        return sorted(rankings, key=lambda x: x[1], reverse=True)
+    async def __aexit__(self, *args):
+        await self.acleanup()
 
     def cleanup(self):
         """Clean up agent resources."""
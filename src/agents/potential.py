@@ -1,11 +1,17 @@
 """Potential scoring agent - renovation and transformation opportunities."""
 
 import json
-from datetime import datetime
 
 from src.models import House, TasteModel, PotentialScore, RenovationIdea
-from src.storage import JsonStore
-from .base import BaseAgent, AESTHETIC_CONTEXT, DEFAULT_MODEL
+from .base import (
+    BaseAgent,
+    clamp,
+    extract_json,
+    room_fields,
+    AESTHETIC_CONTEXT,
+    DEFAULT_MODEL,
+    ERR_SNIPPET_MAX,
+)
 
 
 POTENTIAL_INSTRUCTIONS = f"""{AESTHETIC_CONTEXT}
@@ -26,27 +32,79 @@ Focus on high-impact changes, not cosmetic tweaks.
 """
 
 
+# Per-room block of the potential context, filled via str.format_map
+ROOM_TEMPLATE = """
+- {room_type}:
+  Current quality: {aesthetic_quality}/10
+  Materials: {materials}
+  Condition: {condition}
+  Notes: {notes}
+"""
+
+
 class PotentialAgent(BaseAgent):
     """Agent for evaluating renovation potential."""
 
     name = "potential_agent"
     model = DEFAULT_MODEL
     instructions = POTENTIAL_INSTRUCTIONS
+    cache_system = True
+    json_response = True
 
-    def score(self, house_id: str) -> PotentialScore | None:
+    def score(self, house_id: str, taste: TasteModel | None = None) -> PotentialScore | None:
         """Score a house's renovation potential."""
-        house = self.store.load_house(house_id)
+        prompt = self._prepare(house_id, taste)
+        if prompt is None:
+            return None
+
+        response = self.openrouter.chat(
+            prompt=prompt,
+            system_prompt=self.instructions,
+            cache_system=self.cache_system,
+            json_mode=self.json_response,
+        )
+
+        return self._save_score(house_id, self._parse_response(response))
+
+    async def ascore(
+        self,
+        house_id: str,
+        taste: TasteModel | None = None,
+        house: House | None = None,
+    ) -> PotentialScore | None:
+        """Async variant of score; races parallel samples for a parseable response.
+
+        ``house`` lets the orchestrator pass the copy it already loaded.
+        """
+        prompt = self._prepare(house_id, taste, house)
+        if prompt is None:
+            return None
+
+        response, score = await self.race_completions(prompt, self._try_parse_response)
+        if score is None:
+            score = self._fallback_score(response)
+
+        return self._save_score(house_id, score)
+
+    def _prepare(
+        self,
+        house_id: str,
+        taste: TasteModel | None = None,
+        house: House | None = None,
+    ) -> str | None:
+        """Load inputs and build the potential prompt."""
+        house = house or self.store.load_house(house_id)
         if not house:
             return None
 
-        taste = self.store.load_or_create_taste()
+        taste = taste or self.store.load_or_create_taste()
 
         # Need vision analysis first
         if not house.vision_analysis:
             return None
 
         # Build context
-        context = self._build_context(house, taste)
+        context = self.build_context(house, taste)
 
         prompt = f"""Evaluate this house's renovation potential.
 
@@ -74,29 +132,27 @@ Cost classes: <$50k, $50-100k, $100-200k, $200k+
 Feasibility: light (paint/cosmetic), medium (kitchen/bath), heavy (structural/addition)
 """
 
-        response = self.openrouter.chat(
-            prompt=prompt,
-            system_prompt=self.instructions,
-        )
-
-        # Parse response
-        score = self._parse_response(response)
-
-        # Save to house
-        house.potential_score = score
-        self.store.save_house(house)
+        return prompt
 
+    def _save_score(self, house_id: str, score: PotentialScore) -> PotentialScore:
+        """Save the score onto the house as the store currently holds it
+        (the pending object while saves are deferred).
+        """
+        house = self.store.load_house(house_id)
+        if house:
+            house.potential_score = score
+            self.store.save_house(house)
         return score
 
     def _build_context(self, house: House, taste: TasteModel) -> str:
         """Build context for potential scoring."""
         vision = house.vision_analysis
 
-        context = f"""## House Information
+        parts = [f"""## House Information
 Address: {house.address}
-Price: ${house.price:,} if house.price else 'N/A'
-Year Built: {house.features.year_built or 'Unknown'}
-Sqft: {house.features.sqft or 'Unknown'}
+Price: {f'${house.price:,}' if house.price else 'N/A'}
+Year Built: {house.year_built or 'Unknown'}
+Sqft: {house.sqft or 'Unknown'}
 
 ## Current State (from Vision Analysis)
 Overall Aesthetic: {vision.overall_aesthetic}/10
@@ -104,46 +160,42 @@ Renovation State: {vision.renovation_state}
 Architectural Style: {vision.architectural_style}
 
 ### Room-by-Room:
-"""
-        for room in vision.rooms:
-            context += f"""
-- {room.room_type}:
-  Current quality: {room.aesthetic_quality}/10
-  Materials: {', '.join(room.materials)}
-  Condition: {room.condition}
-  Notes: {room.notes}
-"""
+"""]
+        parts.append("".join([ROOM_TEMPLATE.format_map(room_fields(room)) for room in vision.rooms]))
 
-        context += f"""
+        parts.append(f"""
 ### Red Flags (issues to address):
 {chr(10).join('- ' + f for f in vision.red_flags) or '(none)'}
 
 ### Positive Signals (good bones):
 {chr(10).join('- ' + s for s in vision.positive_signals) or '(none)'}
+""")
+        parts.append(self.taste_context(taste))
+
+        return "".join(parts)
 
+    def _build_taste_context(self, taste: TasteModel) -> str:
+        """Build the renovation tolerance and principles part of the context."""
+        return f"""
 ## User's Renovation Tolerance
 Tolerance: {taste.renovation_tolerance}
-Max Budget: ${taste.renovation_budget_max:,} if taste.renovation_budget_max else 'Not specified'
+Max Budget: {f'${taste.renovation_budget_max:,}' if taste.renovation_budget_max else 'Not specified'}
 
 ## User's Aesthetic Principles (what renovation should achieve):
 {chr(10).join('- ' + p for p in taste.principles) or '(none specified)'}
 """
 
-        return context
-
     def _parse_response(self, response: str) -> PotentialScore:
-        """Parse response into PotentialScore."""
-        try:
-            if "```json" in response:
-                start = response.find("```json") + 7
-                end = response.find("```", start)
-                response = response[start:end].strip()
-            elif "```" in response:
-                start = response.find("```") + 3
-                end = response.find("```", start)
-                response = response[start:end].strip()
+        """Parse response into PotentialScore, falling back to a neutral score."""
+        score = self._try_parse_response(response)
+        if score is None:
+            return self._fallback_score(response)
+        return score
 
-            data = json.loads(response)
+    def _try_parse_response(self, response: str) -> PotentialScore | None:
+        """Parse response into PotentialScore, or None if it isn't valid JSON."""
+        try:
+            data = extract_json(response)
 
             ideas = []
             for idea in data.get("renovation_ideas", []):
@@ -156,7 +208,7 @@ Max Budget: ${taste.renovation_budget_max:,} if taste.renovation_budget_max else
                 ))
 
             return PotentialScore(
-                score=data.get("score", 50.0),
+                score=clamp(data.get("score", 50.0), 0.0, 100.0),
                 renovation_ideas=ideas,
                 feasibility=data.get("feasibility", "medium"),
                 cost_class=data.get("cost_class", "$50-100k"),
@@ -164,10 +216,14 @@ Max Budget: ${taste.renovation_budget_max:,} if taste.renovation_budget_max else
                 upside_narrative=data.get("upside_narrative", ""),
             )
 
-        except (json.JSONDecodeError, KeyError, TypeError):
-            return PotentialScore(
-                score=50.0,
-                feasibility="unknown",
-                cost_class="unknown",
-                upside_narrative=f"Parse error. Raw: {response[:300]}",
-            )
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
+    def _fallback_score(self, response: str) -> PotentialScore:
+        """Neutral score recorded when the model response can't be parsed."""
+        return PotentialScore(
+            score=50.0,
+            feasibility="unknown",
+            cost_class="unknown",
+            upside_narrative=f"Parse error. Raw: {response[:ERR_SNIPPET_MAX]}",
+        )
@@ -3,11 +3,18 @@
 import json
 from datetime import datetime
 
-from agents import Agent, function_tool
-
 from src.models import House, TasteModel, PresentFitScore, DimensionScore
-from src.storage import JsonStore
-from .base import BaseAgent, AESTHETIC_CONTEXT, SCORING_CONTEXT, DEFAULT_MODEL
+from .base import (
+    BaseAgent,
+    clamp,
+    extract_json,
+    room_fields,
+    AESTHETIC_CONTEXT,
+    SCORING_CONTEXT,
+    DEFAULT_MODEL,
+    DESC_FIT_MAX,
+    ERR_SNIPPET_MAX,
+)
 
 
 PRESENT_FIT_INSTRUCTIONS = f"""{AESTHETIC_CONTEXT}
@@ -31,36 +38,84 @@ The final score is a weighted average, minus penalties for violations.
 """
 
 
+# Per-room block of the scoring context, filled via str.format_map
+ROOM_TEMPLATE = """
+- {room_type}: {aesthetic_quality}/10
+  Materials: {materials}
+  Light: {light_quality}
+  Condition: {condition}
+  Notes: {notes}
+"""
+
+
 class PresentFitAgent(BaseAgent):
     """Agent for present-fit scoring against taste model."""
 
     name = "present_fit_judge"
     model = DEFAULT_MODEL
     instructions = PRESENT_FIT_INSTRUCTIONS
+    cache_system = True
+    json_response = True
 
-    def score(self, house_id: str) -> PresentFitScore | None:
+    def score(self, house_id: str, taste: TasteModel | None = None) -> PresentFitScore | None:
         """Score a house for present-fit against taste model."""
-        house = self.store.load_house(house_id)
+        prepared = self._prepare(house_id, taste)
+        if prepared is None:
+            return None
+        taste, prompt = prepared
+
+        response = self.openrouter.chat(
+            prompt=prompt,
+            system_prompt=self.instructions,
+            cache_system=self.cache_system,
+            json_mode=self.json_response,
+        )
+
+        return self._save_score(house_id, self._parse_response(response, taste))
+
+    async def ascore(
+        self,
+        house_id: str,
+        taste: TasteModel | None = None,
+        house: House | None = None,
+    ) -> PresentFitScore | None:
+        """Async variant of score; races parallel samples for a parseable response.
+
+        ``house`` lets the orchestrator pass the copy it already loaded.
+        """
+        prepared = self._prepare(house_id, taste, house)
+        if prepared is None:
+            return None
+        taste, prompt = prepared
+
+        response, score = await self.race_completions(
+            prompt, lambda r: self._try_parse_response(r, taste)
+        )
+        if score is None:
+            score = self._fallback_score(response)
+
+        return self._save_score(house_id, score)
+
+    def _prepare(
+        self,
+        house_id: str,
+        taste: TasteModel | None = None,
+        house: House | None = None,
+    ) -> tuple[TasteModel, str] | None:
+        """Load inputs and build the scoring prompt."""
+        house = house or self.store.load_house(house_id)
         if not house:
             return None
 
-        taste = self.store.load_or_create_taste()
+        taste = taste or self.store.load_or_create_taste()
 
         # Need vision analysis first
         if not house.vision_analysis:
             return None
 
         # Build scoring context
-        context = self._build_context(house, taste)
-
-        # Create agent with tools
-        agent = Agent(
-            name=self.name,
-            instructions=self.instructions,
-            model=self.model,
-        )
+        context = self.build_context(house, taste)
 
-        # Run scoring
         prompt = f"""Score this house for present-fit.
 
 {context}
@@ -79,33 +134,33 @@ Respond with JSON in this format:
     "deal_breakers": []
 }}
 """
+        return taste, prompt
 
-        response = self.openrouter.chat(
-            prompt=prompt,
-            system_prompt=self.instructions,
-        )
-
-        # Parse response
-        score = self._parse_response(response, taste)
-
-        # Save to house
-        house.present_fit_score = score
-        house.scored_at = datetime.now()
-        self.store.save_house(house)
+    def _save_score(self, house_id: str, score: PresentFitScore) -> PresentFitScore:
+        """Save the score onto the house as the store currently holds it
+        (the pending object while saves are deferred).
 
+        Loading right before the write keeps results from agents that ran
+        concurrently on the same house (e.g. potential) from being clobbered.
+        """
+        house = self.store.load_house(house_id)
+        if house:
+            house.present_fit_score = score
+            house.scored_at = datetime.now()
+            self.store.save_house(house)
         return score
 
     def _build_context(self, house: House, taste: TasteModel) -> str:
         """Build context string for scoring."""
         vision = house.vision_analysis
 
-        context = f"""## House Information
+        parts = [f"""## House Information
 Address: {house.address}
-Price: ${house.price:,} if house.price else 'N/A'
-Beds: {house.features.bedrooms} | Baths: {house.features.bathrooms} | Sqft: {house.features.sqft}
+Price: {f'${house.price:,}' if house.price else 'N/A'}
+Beds: {house.bedrooms} | Baths: {house.bathrooms} | Sqft: {house.sqft}
 
 ## Listing Description
-{house.description[:1000] if house.description else 'No description'}
+{house.description[:DESC_FIT_MAX] if house.description else 'No description'}
 
 ## Vision Analysis
 Overall Aesthetic: {vision.overall_aesthetic}/10
@@ -113,23 +168,23 @@ Architectural Style: {vision.architectural_style}
 Renovation State: {vision.renovation_state}
 
 ### Rooms Analyzed:
-"""
-        for room in vision.rooms:
-            context += f"""
-- {room.room_type}: {room.aesthetic_quality}/10
-  Materials: {', '.join(room.materials)}
-  Light: {room.light_quality}
-  Condition: {room.condition}
-  Notes: {room.notes}
-"""
+"""]
+        parts.append("".join([ROOM_TEMPLATE.format_map(room_fields(room)) for room in vision.rooms]))
 
-        context += f"""
+        parts.append(f"""
 ### Red Flags:
 {chr(10).join('- ' + f for f in vision.red_flags) or '(none)'}
 
 ### Positive Signals:
 {chr(10).join('- ' + s for s in vision.positive_signals) or '(none)'}
+""")
+        parts.append(self.taste_context(taste))
+
+        return "".join(parts)
 
+    def _build_taste_context(self, taste: TasteModel) -> str:
+        """Build the taste model part of the scoring context."""
+        parts = [f"""
 ## Taste Model
 
 ### Principles (what to look for):
@@ -148,41 +203,39 @@ Renovation State: {vision.renovation_state}
 {chr(10).join('- ' + v for v in taste.violation_patterns) or '(none specified)'}
 
 ### Scoring Dimensions:
-"""
-        for dim in taste.dimensions:
-            context += f"- {dim.name} (weight: {dim.weight}): {dim.description}\n"
+"""]
+        parts.extend(
+            f"- {dim.name} (weight: {dim.weight}): {dim.description}\n" for dim in taste.dimensions
+        )
 
-        return context
+        return "".join(parts)
 
     def _parse_response(self, response: str, taste: TasteModel) -> PresentFitScore:
-        """Parse scoring response into PresentFitScore."""
+        """Parse response into PresentFitScore, falling back to a neutral score."""
+        score = self._try_parse_response(response, taste)
+        if score is None:
+            return self._fallback_score(response)
+        return score
+
+    def _try_parse_response(self, response: str, taste: TasteModel) -> PresentFitScore | None:
+        """Parse response into PresentFitScore, or None if it isn't valid JSON."""
         try:
-            # Handle markdown code blocks
-            if "```json" in response:
-                start = response.find("```json") + 7
-                end = response.find("```", start)
-                response = response[start:end].strip()
-            elif "```" in response:
-                start = response.find("```") + 3
-                end = response.find("```", start)
-                response = response[start:end].strip()
-
-            data = json.loads(response)
+            data = extract_json(response)
 
             dimension_scores = []
             for ds in data.get("dimension_scores", []):
                 # Clamp score to 0-10 range (some models may return 0-100)
-                raw_score = ds.get("score", 5.0)
-                clamped_score = min(10.0, max(0.0, raw_score if raw_score <= 10 else raw_score / 10))
+                raw_score = float(ds.get("score", 5.0))
+                clamped_score = clamp(raw_score if raw_score <= 10 else raw_score / 10, 0.0, 10.0)
                 dimension_scores.append(DimensionScore(
                     dimension=ds.get("dimension", ""),
                     score=clamped_score,
-                    weight=min(1.0, max(0.0, ds.get("weight", 0.1))),
+                    weight=clamp(ds.get("weight", 0.1), 0.0, 1.0),
                     notes=ds.get("notes", ""),
                 ))
 
             return PresentFitScore(
-                score=data.get("score", 50.0),
+                score=clamp(data.get("score", 50.0), 0.0, 100.0),
                 passed=data.get("passed", True),
                 violations=data.get("violations", []),
                 dimension_scores=dimension_scores,
@@ -190,11 +243,14 @@ Renovation State: {vision.renovation_state}
                 deal_breakers=data.get("deal_breakers", []),
             )
 
-        except (json.JSONDecodeError, KeyError, TypeError):
-            # Fallback score
-            return PresentFitScore(
-                score=50.0,
-                passed=True,
-                violations=[],
-                justification=f"Scoring parse error. Raw: {response[:300]}",
-            )
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
+    def _fallback_score(self, response: str) -> PresentFitScore:
+        """Neutral score recorded when the model response can't be parsed."""
+        return PresentFitScore(
+            score=50.0,
+            passed=True,
+            violations=[],
+            justification=f"Scoring parse error. Raw: {response[:ERR_SNIPPET_MAX]}",
+        )
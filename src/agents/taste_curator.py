@@ -1,9 +1,12 @@
 """Taste curator agent - evolves preferences from feedback."""
 
+import heapq
+import re
+
 from rich.console import Console
 from rich.prompt import Prompt
 
-from src.models import TasteModel, WeightedDimension, Exemplar
+from src.models import TasteModel
 from src.storage import JsonStore
 from .base import BaseAgent, DEFAULT_MODEL
 
@@ -24,39 +27,49 @@ When reviewing decisions:
 """
 
 
+RENOVATION_TOLERANCES = frozenset({"none", "light", "medium", "heavy"})
+
+# Most recent verdicts included when reviewing decisions
+RECENT_DECISIONS_LIMIT = 10
+
+_PROPOSAL_RE = re.compile(r"^PROPOSAL:(.*)$", re.MULTILINE)
+
+
 class TasteCuratorAgent(BaseAgent):
     """Agent for curating and evolving the taste model."""
 
     name = "taste_curator"
     model = DEFAULT_MODEL
     instructions = CURATOR_INSTRUCTIONS
+    cache_system = True
 
     def review_recent_decisions(self) -> list[str]:
         """Review recent user decisions and propose taste updates."""
-        houses = self.store.list_houses()
-
-        # Find houses with both scores and user verdicts
-        annotated = [h for h in houses if h.user_verdict and h.present_fit_score]
+        # Most recently decided houses with both scores and user verdicts;
+        # houses annotated before decided_at existed fall back to ingestion time
+        annotated = heapq.nlargest(
+            RECENT_DECISIONS_LIMIT,
+            (h for h in self.store.list_houses() if h.user_verdict and h.present_fit_score),
+            key=lambda h: h.decided_at or h.ingested_at,
+        )
 
         if len(annotated) < 2:
             return []
 
         # Analyze patterns
-        context = "## Recent Decisions\n"
-        for h in annotated[:10]:
-            context += f"""
+        parts = ["## Recent Decisions\n"]
+        parts.extend(
+            f"""
 House: {h.address}
 Score: {h.present_fit_score.score:.0f}
 User Verdict: {h.user_verdict}
 Key violations: {', '.join(h.present_fit_score.violations[:3]) or 'None'}
 """
+            for h in annotated
+        )
+        context = "".join(parts)
 
         taste = self.store.load_or_create_taste()
-        context += f"""
-## Current Taste Model
-Principles: {taste.principles}
-Anti-Principles: {taste.anti_principles}
-"""
 
         prompt = f"""Based on these recent decisions, identify any patterns where the scoring
 doesn't match user preferences. Propose specific updates.
@@ -70,14 +83,12 @@ REASON: [why, based on evidence]
 
         response = self.openrouter.chat(
             prompt=prompt,
-            system_prompt=self.instructions,
+            system_prompt=self._system_prompt(taste),
+            cache_system=self.cache_system,
         )
 
         # Parse proposals (simple extraction)
-        proposals = []
-        for line in response.split("\n"):
-            if line.startswith("PROPOSAL:"):
-                proposals.append(line[9:].strip())
+        proposals = [p.strip() for p in _PROPOSAL_RE.findall(response)]
 
         return proposals if proposals else [response]
 
@@ -90,12 +101,6 @@ REASON: [why, based on evidence]
 
 Proposal: {proposal}
 
-Current model:
-- Principles: {taste.principles}
-- Anti-principles: {taste.anti_principles}
-- Hard constraints: {taste.hard_constraints}
-- Violation patterns: {taste.violation_patterns}
-
 Respond with JSON indicating the change:
 {{
     "action": "add_principle" | "remove_principle" | "add_anti_principle" | "add_violation_pattern" | "adjust_weight",
@@ -104,7 +109,11 @@ Respond with JSON indicating the change:
 }}
 """
 
-        response = self.openrouter.chat(prompt=prompt, system_prompt=self.instructions)
+        response = self.openrouter.chat(
+            prompt=prompt,
+            system_prompt=self._system_prompt(taste),
+            cache_system=self.cache_system,
+        )
 
         # Simple application based on keywords
         if "add_principle" in response.lower() or "principle" in proposal.lower():
@@ -117,6 +126,36 @@ Respond with JSON indicating the change:
         taste.version += 1
         self.store.save_taste(taste)
 
+    def _system_prompt(self, taste: TasteModel) -> str:
+        """Instructions plus the taste document, sent as one cacheable system block.
+
+        Only the decisions or proposal in the user message vary between calls,
+        so repeated reviews reuse the provider's cached prefix.
+        """
+        return f"{self.instructions}\n{self.taste_context(taste)}"
+
+    def _build_taste_context(self, taste: TasteModel) -> str:
+        """Build the taste model and aesthetics.md document for the system prompt."""
+        parts = [f"""
+## Current Taste Model (version {taste.version})
+Principles: {taste.principles}
+Anti-Principles: {taste.anti_principles}
+Hard Constraints: {taste.hard_constraints}
+Soft Constraints: {taste.soft_constraints}
+Violation Patterns: {taste.violation_patterns}
+Dimensions: {', '.join(f'{d.name} ({d.weight})' for d in taste.dimensions) or 'None'}
+Renovation Tolerance: {taste.renovation_tolerance}
+"""]
+
+        aesthetics = self.store.load_aesthetics()
+        if aesthetics:
+            parts.append(f"""
+## aesthetics.md
+{aesthetics}
+""")
+
+        return "".join(parts)
+
 
 def run_taste_interview(store: JsonStore) -> TasteModel:
     """Run interactive taste interview to bootstrap preferences."""
@@ -149,8 +188,9 @@ def run_taste_interview(store: JsonStore) -> TasteModel:
         elif category == "hard_constraints":
             taste.hard_constraints.append(answer)
         elif category == "renovation":
-            if answer.lower() in ("none", "light", "medium", "heavy"):
-                taste.renovation_tolerance = answer.lower()
+            tolerance = answer.strip().lower()
+            if tolerance in RENOVATION_TOLERANCES:
+                taste.renovation_tolerance = tolerance
 
     # Ask for budget
     console.print("\n[cyan]What's your maximum renovation budget? (e.g., 100000)[/cyan]")
@@ -1,12 +1,11 @@
 """Vision analysis agent for house images."""
 
+import hashlib
 import json
-from datetime import datetime
 
 from src.models import House, VisionAnalysis, RoomAnalysis
-from src.storage import JsonStore
-from src.services.image_composite import create_composite_sync
-from .base import BaseAgent, AESTHETIC_CONTEXT, VISION_MODEL
+from src.services.image_composite import create_composite, create_composite_sync
+from .base import BaseAgent, clamp, extract_json, AESTHETIC_CONTEXT, VISION_MODEL
 
 
 VISION_SYSTEM_PROMPT = f"""{AESTHETIC_CONTEXT}
@@ -26,26 +25,32 @@ Be specific and observant. Note actual materials visible (hardwood vs laminate,
 Look for signs of recent flips (grey paint everywhere, cheap LVP, builder-grade everything).
 """
 
+# Bump when the vision prompts change so cached analyses are not reused
+VISION_PROMPT_VERSION = 1
+
+# Limit the composite to a 6x6 grid, balancing coverage with image size
+VISION_MAX_IMAGES = 36
+
 VISION_ANALYSIS_PROMPT = """Analyze this composite image of a real estate listing.
 
 Respond with a JSON object in this exact format:
-{{
+{
     "rooms": [
-        {{
+        {
             "room_type": "kitchen",
             "aesthetic_quality": 7,
             "materials": ["granite counters", "hardwood floors", "stainless appliances"],
             "light_quality": "abundant",
             "condition": "updated",
             "notes": "Modern renovation with quality materials"
-        }}
+        }
     ],
     "overall_aesthetic": 7,
     "architectural_style": "craftsman",
     "red_flags": ["grey paint throughout suggests recent flip"],
     "positive_signals": ["original hardwood floors", "large windows"],
     "renovation_state": "partial"
-}}
+}
 
 Analyze every distinct room visible in the grid. Be thorough and specific.
 """
@@ -57,6 +62,8 @@ class VisionAgent(BaseAgent):
     name = "vision_analyst"
     model = VISION_MODEL
     instructions = VISION_SYSTEM_PROMPT
+    cache_system = True
+    json_response = True
 
     def analyze(self, house_id: str) -> VisionAnalysis | None:
         """Analyze a house's images and return vision analysis."""
@@ -64,76 +71,155 @@ class VisionAgent(BaseAgent):
         if not house:
             return None
 
-        if not house.image_urls:
-            # No images to analyze - still save placeholder analysis
-            analysis = VisionAnalysis(
-                overall_aesthetic=5,
-                raw_description="No images available for analysis",
-            )
-            house.vision_analysis = analysis
-            self.store.save_house(house)
-            return analysis
+        if not house.has_images:
+            return self.save_placeholder(house)
 
-        # Create composite image (limit to 36 images for reasonable grid size)
-        # This creates a 6x6 grid at most, balancing coverage with image size
-        composite_bytes = create_composite_sync(house.image_urls, max_images=36)
+        cache_key = self._cache_key(house)
+        cached = self._load_cached(house, cache_key)
+        if cached is not None:
+            return cached
+
+        composite_bytes = create_composite_sync(
+            house.image_urls,
+            max_images=VISION_MAX_IMAGES,
+            cache_dir=self.store.composite_cache_dir,
+            thumb_cache_dir=self.store.thumb_cache_dir,
+        )
 
         # Send to vision model
         response = self.openrouter.vision(
             prompt=VISION_ANALYSIS_PROMPT,
             image_bytes=composite_bytes,
             system_prompt=VISION_SYSTEM_PROMPT,
+            cache_system=self.cache_system,
+            json_mode=self.json_response,
+        )
+
+        return self._save_analysis(house, response, cache_key)
+
+    async def aanalyze(self, house_id: str, house: House | None = None) -> VisionAnalysis | None:
+        """Async variant of analyze for use inside the orchestrator's event loop.
+
+        ``house`` lets the orchestrator pass the copy it already loaded; the
+        analysis is set on it in place.
+        """
+        house = house or self.store.load_house(house_id)
+        if not house:
+            return None
+
+        if not house.has_images:
+            return self.save_placeholder(house)
+
+        cache_key = self._cache_key(house)
+        cached = self._load_cached(house, cache_key)
+        if cached is not None:
+            return cached
+
+        composite_bytes = await create_composite(
+            house.image_urls,
+            max_images=VISION_MAX_IMAGES,
+            cache_dir=self.store.composite_cache_dir,
+            thumb_cache_dir=self.store.thumb_cache_dir,
+        )
+
+        response = await self.openrouter.avision(
+            prompt=VISION_ANALYSIS_PROMPT,
+            image_bytes=composite_bytes,
+            system_prompt=VISION_SYSTEM_PROMPT,
+            cache_system=self.cache_system,
+            json_mode=self.json_response,
+        )
+
+        return self._save_analysis(house, response, cache_key)
+
+    def _cache_key(self, house: House) -> str:
+        """Key an analysis on the composited images, the model and the prompt version.
+
+        Sorted so the key doesn't change when the same photos are re-imported
+        in a different order.
+        """
+        payload = json.dumps([
+            sorted(house.image_urls[:VISION_MAX_IMAGES]),
+            self.openrouter.config.default_vision_model,
+            VISION_PROMPT_VERSION,
+        ])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load_cached(self, house: House, cache_key: str) -> VisionAnalysis | None:
+        """Reuse a cached analysis of the same images, skipping the composite and model call."""
+        data = self.store.load_vision_cache(cache_key)
+        if data is None:
+            return None
+
+        analysis = VisionAnalysis.from_trusted(data)
+        house.vision_analysis = analysis
+        self.store.save_house(house)
+        return analysis
+
+    def save_placeholder(self, house: House) -> VisionAnalysis:
+        """Save placeholder analysis for a house with no images."""
+        analysis = VisionAnalysis(
+            overall_aesthetic=5,
+            raw_description="No images available for analysis",
         )
+        house.vision_analysis = analysis
+        self.store.save_house(house)
+        return analysis
 
-        # Parse response
-        analysis = self._parse_response(response)
-        analysis.raw_description = response
+    def _save_analysis(
+        self,
+        house: House,
+        response: str,
+        cache_key: str | None = None,
+    ) -> VisionAnalysis:
+        """Parse the model response and save it to the house.
+
+        Only analyses that parsed are cached, so a bad response is retried
+        on the next run.
+        """
+        parsed = self._try_parse_response(response)
+        analysis = parsed if parsed is not None else self._fallback_analysis(response)
+        analysis = analysis.model_copy(update={"raw_description": response})
+        if parsed is not None and cache_key:
+            self.store.save_vision_cache(cache_key, analysis.model_dump())
 
-        # Save to house
         house.vision_analysis = analysis
         self.store.save_house(house)
 
         return analysis
 
-    def _parse_response(self, response: str) -> VisionAnalysis:
-        """Parse vision model response into VisionAnalysis."""
-        # Try to extract JSON from response
+    def _try_parse_response(self, response: str) -> VisionAnalysis | None:
+        """Parse vision model response, or None if it isn't valid JSON."""
         try:
-            # Handle markdown code blocks
-            if "```json" in response:
-                start = response.find("```json") + 7
-                end = response.find("```", start)
-                response = response[start:end].strip()
-            elif "```" in response:
-                start = response.find("```") + 3
-                end = response.find("```", start)
-                response = response[start:end].strip()
-
-            data = json.loads(response)
-
-            rooms = []
-            for room_data in data.get("rooms", []):
-                rooms.append(RoomAnalysis(
+            data = extract_json(response)
+
+            rooms = [
+                RoomAnalysis(
                     room_type=room_data.get("room_type", "unknown"),
-                    aesthetic_quality=room_data.get("aesthetic_quality", 5),
+                    aesthetic_quality=clamp(room_data.get("aesthetic_quality", 5), 1, 10),
                     materials=room_data.get("materials", []),
                     light_quality=room_data.get("light_quality", ""),
                     condition=room_data.get("condition", ""),
                     notes=room_data.get("notes", ""),
-                ))
+                )
+                for room_data in data.get("rooms", [])
+            ]
 
             return VisionAnalysis(
                 rooms=rooms,
-                overall_aesthetic=data.get("overall_aesthetic", 5),
+                overall_aesthetic=clamp(data.get("overall_aesthetic", 5), 1, 10),
                 architectural_style=data.get("architectural_style", ""),
                 red_flags=data.get("red_flags", []),
                 positive_signals=data.get("positive_signals", []),
                 renovation_state=data.get("renovation_state", ""),
             )
 
-        except (json.JSONDecodeError, KeyError, TypeError):
-            # Fallback if parsing fails
-            return VisionAnalysis(
-                overall_aesthetic=5,
-                raw_description=f"Parse error. Raw response: {response[:500]}",
-            )
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
+    def _fallback_analysis(self, response: str) -> VisionAnalysis:
+        """Neutral analysis recorded when the response can't be parsed."""
+        return VisionAnalysis(
+            overall_aesthetic=5,
+            raw_description=f"Parse error. Raw response: {response[:500]}",
+        )
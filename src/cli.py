@@ -2,33 +2,37 @@
 
 import json
 import os
+import re
+from functools import cache
 from pathlib import Path
 
 import typer
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.markdown import Markdown
 
-from src.storage import JsonStore
-from src.models import House, TasteModel
+
+# KEY=value lines; comment lines are skipped and whitespace around key and value is dropped
+_ENV_LINE_RE = re.compile(r"^[ \t]*([^#=\s][^=\n]*?)[ \t]*=[ \t]*(.*?)[ \t\r]*$", re.MULTILINE)
 
 
 def load_env():
     """Load environment variables from .env file if it exists."""
     env_path = Path(__file__).parent.parent / ".env"
     if env_path.exists():
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, value = line.split("=", 1)
-                    os.environ.setdefault(key.strip(), value.strip())
+        for key, value in _ENV_LINE_RE.findall(env_path.read_text()):
+            os.environ.setdefault(key, value)
 
 
 # Load .env on import
 load_env()
 
+
+def _parse_int(value: str) -> int | None:
+    """Parse a prompted number, or None if it's blank or not a number."""
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
 app = typer.Typer(name="house", help="Agentic home listing aesthetic evaluator")
 house_app = typer.Typer(help="House management commands")
 taste_app = typer.Typer(help="Taste model commands")
@@ -37,7 +41,22 @@ app.add_typer(house_app, name="house")
 app.add_typer(taste_app, name="taste")
 
 console = Console()
-store = JsonStore()
+
+
+def _group_by_address(houses: list) -> dict[str, list]:
+    """Houses keyed by address, so each address is geocoded once."""
+    by_address: dict[str, list] = {}
+    for house in houses:
+        by_address.setdefault(house.address, []).append(house)
+    return by_address
+
+
+@cache
+def get_store():
+    """The data store, created on first use so --help doesn't import the models."""
+    from src.storage import JsonStore
+
+    return JsonStore()
 
 
 # House commands
@@ -50,6 +69,9 @@ def house_ingest(
     interactive: bool = typer.Option(False, "--interactive", "-i", help="Interactive data entry"),
 ):
     """Ingest a house listing from Zillow URL."""
+    from src.models import House
+
+    store = get_store()
     if data:
         # Parse JSON data from Claude Code scraper
         try:
@@ -88,7 +110,7 @@ def house_ingest(
         console.print("[yellow]Interactive mode - enter listing details:[/yellow]")
         address = typer.prompt("Address")
         price_str = typer.prompt("Price (numbers only)", default="")
-        price = int(price_str) if price_str else None
+        price = _parse_int(price_str)
         description = typer.prompt("Description", default="")
         images_str = typer.prompt("Image URLs (comma-separated)", default="")
         image_urls = [u.strip() for u in images_str.split(",") if u.strip()]
@@ -119,8 +141,12 @@ def house_import_search(
     data: str = typer.Option(None, "--data", "-d", help="JSON array of listings from scraper"),
     limit: int = typer.Option(20, "--limit", "-l", help="Max listings to import"),
     score: bool = typer.Option(False, "--score", "-s", help="Auto-score after import"),
+    concurrency: int = typer.Option(5, "--concurrency", "-j", min=1, help="Number of houses scored at once"),
 ):
     """Import multiple houses from a Zillow search results page."""
+    from src.models import House
+
+    store = get_store()
     if data:
         # Parse JSON array of listings
         try:
@@ -140,6 +166,7 @@ def house_import_search(
         imported = 0
         skipped = 0
         imported_ids = []
+        existing = store.existing_addresses()
 
         for listing in listings:
             address = listing.get("address", "")
@@ -149,7 +176,8 @@ def house_import_search(
                 continue
 
             # Check for duplicates
-            if store.house_exists(address):
+            normalized = store.normalize_address(address)
+            if normalized in existing:
                 console.print(f"  [yellow]⚠ {address} - already exists, skipped[/yellow]")
                 skipped += 1
                 continue
@@ -175,6 +203,7 @@ def house_import_search(
                 house.zip_code = listing["zip_code"]
 
             store.save_house(house)
+            existing.add(normalized)
             imported_ids.append(house_id)
             console.print(f"  [green]✓ {address} - imported[/green]")
             imported += 1
@@ -186,20 +215,7 @@ def house_import_search(
             console.print(f"\n[yellow]Scoring {len(imported_ids)} new listings...[/yellow]\n")
             from src.agents.orchestrator import Orchestrator
             orchestrator = Orchestrator(store)
-
-            for i, house_id in enumerate(imported_ids, 1):
-                house = store.load_house(house_id)
-                if house:
-                    console.print(f"({i}/{len(imported_ids)}) {house.address}")
-                    try:
-                        orchestrator.score_house(house_id)
-                        scored = store.load_house(house_id)
-                        if scored and scored.present_fit_score:
-                            potential_str = f"{scored.potential_score.score:.0f}" if scored.potential_score else "-"
-                            console.print(f"  [green]✓[/green] Fit: {scored.present_fit_score.score:.0f} | Potential: {potential_str}")
-                    except Exception as e:
-                        console.print(f"  [red]✗ Error: {e}[/red]")
-
+            orchestrator.batch_score(imported_ids, max_concurrency=concurrency)
             orchestrator.cleanup()
             console.print("\n[green]Scoring complete![/green]")
         elif imported > 0:
@@ -218,6 +234,7 @@ def house_score(
     house_id: str = typer.Argument(..., help="House ID to score"),
 ):
     """Run the full scoring pipeline on a house."""
+    store = get_store()
     house = store.load_house(house_id)
     if not house:
         console.print(f"[red]House not found: {house_id}[/red]")
@@ -246,8 +263,10 @@ def house_score(
 @house_app.command("batch-score")
 def house_batch_score(
     all_houses: bool = typer.Option(False, "--all", "-a", help="Score all houses, including already scored"),
+    concurrency: int = typer.Option(5, "--concurrency", "-j", min=1, help="Number of houses scored at once"),
 ):
     """Score all unscored houses in the database."""
+    store = get_store()
     houses = store.list_houses()
 
     if not all_houses:
@@ -258,34 +277,18 @@ def house_batch_score(
         console.print("[dim]No houses to score.[/dim]")
         return
 
-    console.print(f"[cyan]Scoring {len(houses)} houses...[/cyan]\n")
-
     from src.agents.orchestrator import Orchestrator
     orchestrator = Orchestrator(store)
-
-    success_count = 0
-    for i, house in enumerate(houses, 1):
-        console.print(f"\n[bold]({i}/{len(houses)}) {house.address}[/bold]")
-        try:
-            result = orchestrator.score_house(house.id)
-            if result:
-                success_count += 1
-                scored = store.load_house(house.id)
-                if scored and scored.present_fit_score:
-                    potential_str = f"{scored.potential_score.score:.0f}" if scored.potential_score else "-"
-                    console.print(f"  [green]✓[/green] Fit: {scored.present_fit_score.score:.0f} | Potential: {potential_str}")
-            else:
-                console.print("  [red]✗ Failed[/red]")
-        except Exception as e:
-            console.print(f"  [red]✗ Error: {e}[/red]")
-
-    console.print(f"\n[cyan]Batch complete: {success_count}/{len(houses)} succeeded[/cyan]")
+    orchestrator.batch_score([h.id for h in houses], max_concurrency=concurrency)
     orchestrator.cleanup()
 
 
 @house_app.command("list")
 def house_list():
     """List all ingested houses."""
+    from rich.table import Table
+
+    store = get_store()
     houses = store.list_houses()
 
     if not houses:
@@ -314,6 +317,10 @@ def house_show(
     house_id: str = typer.Argument(..., help="House ID to display"),
 ):
     """Display detailed house information and brief."""
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    store = get_store()
     house = store.load_house(house_id)
     if not house:
         console.print(f"[red]House not found: {house_id}[/red]")
@@ -321,13 +328,13 @@ def house_show(
 
     # Basic info panel
     info = f"""**Address:** {house.address}
-**Price:** ${house.price:,} if house.price else 'N/A'
+**Price:** {f'${house.price:,}' if house.price else 'N/A'}
 **URL:** {house.url}
 **Images:** {len(house.image_urls)}
 """
 
-    if house.features.bedrooms:
-        info += f"**Beds:** {house.features.bedrooms} | **Baths:** {house.features.bathrooms} | **Sqft:** {house.features.sqft:,}"
+    if house.bedrooms:
+        info += f"**Beds:** {house.bedrooms} | **Baths:** {house.bathrooms} | **Sqft:** {house.sqft:,}"
 
     console.print(Panel(Markdown(info), title=f"House: {house_id}"))
 
@@ -361,6 +368,7 @@ def house_delete(
     force: bool = typer.Option(False, "--force", "-f", help="Skip confirmation"),
 ):
     """Delete a house from the database."""
+    store = get_store()
     house = store.load_house(house_id)
     if not house:
         console.print(f"[red]House not found: {house_id}[/red]")
@@ -381,6 +389,7 @@ def house_delete(
 @taste_app.command("init")
 def taste_init():
     """Initialize taste model through interactive interview."""
+    store = get_store()
     if store.taste_exists():
         console.print("[yellow]Taste model already exists.[/yellow]")
         if not typer.confirm("Reinitialize?"):
@@ -398,6 +407,10 @@ def taste_init():
 @taste_app.command("show")
 def taste_show():
     """Display current taste model."""
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    store = get_store()
     taste = store.load_taste()
     if not taste:
         console.print("[yellow]No taste model found. Run 'taste init' first.[/yellow]")
@@ -416,7 +429,7 @@ def taste_show():
 {chr(10).join('- ' + v for v in taste.violation_patterns) or '(none)'}
 
 ## Renovation Tolerance
-{taste.renovation_tolerance} (max: ${taste.renovation_budget_max:,} if taste.renovation_budget_max else 'not set')
+{taste.renovation_tolerance} (max: {f'${taste.renovation_budget_max:,}' if taste.renovation_budget_max else 'not set'})
 """
 
     console.print(Panel(Markdown(info), title="Taste Model"))
@@ -425,6 +438,7 @@ def taste_show():
 @taste_app.command("distill")
 def taste_distill():
     """Regenerate aesthetics.md from taste model."""
+    store = get_store()
     taste = store.load_taste()
     if not taste:
         console.print("[yellow]No taste model found. Run 'taste init' first.[/yellow]")
@@ -432,9 +446,10 @@ def taste_distill():
 
     console.print("[yellow]Distilling taste model to aesthetics.md...[/yellow]")
 
+    from src.agents.base import AgentContext
     from src.agents.distiller import DistillerAgent
 
-    agent = DistillerAgent(store)
+    agent = DistillerAgent(AgentContext.create(store))
     content = agent.distill()
     store.save_aesthetics(content)
 
@@ -448,6 +463,9 @@ def taste_annotate(
     note: str = typer.Option(None, "--note", "-n", help="Free-form note"),
 ):
     """Add feedback/annotation to a house."""
+    from datetime import datetime
+
+    store = get_store()
     house = store.load_house(house_id)
     if not house:
         console.print(f"[red]House not found: {house_id}[/red]")
@@ -458,6 +476,7 @@ def taste_annotate(
             console.print("[red]Verdict must be: liked, disliked, or shortlisted[/red]")
             raise typer.Exit(1)
         house.user_verdict = verdict
+        house.decided_at = datetime.now()
 
     if note:
         house.annotations.append(note)
@@ -476,7 +495,8 @@ def house_geocode(
     force: bool = typer.Option(False, "--force", "-f", help="Re-geocode even if coordinates exist"),
 ):
     """Geocode house addresses to get lat/lng coordinates for map display."""
-    from src.services.geocoding import geocode_address
+    store = get_store()
+    from src.services.geocoding import batch_geocode, geocode_address
 
     if house_id:
         # Geocode single house
@@ -491,7 +511,7 @@ def house_geocode(
             return
 
         console.print(f"[yellow]Geocoding: {house.address}[/yellow]")
-        coords = geocode_address(house.address)
+        coords = geocode_address(house.address, store.geocode_cache_file)
         if coords:
             house.latitude, house.longitude = coords
             store.save_house(house)
@@ -511,17 +531,25 @@ def house_geocode(
 
         console.print(f"[cyan]Geocoding {len(houses)} houses...[/cyan]\n")
 
+        by_address = _group_by_address(houses)
+        done = 0
         success = 0
-        for i, house in enumerate(houses, 1):
-            console.print(f"({i}/{len(houses)}) {house.address}", end=" ")
-            coords = geocode_address(house.address)
-            if coords:
-                house.latitude, house.longitude = coords
-                store.save_house(house)
-                console.print(f"[green]✓[/green]")
-                success += 1
-            else:
-                console.print(f"[red]✗[/red]")
+
+        def on_result(address, coords):
+            nonlocal done, success
+            for house in by_address[address]:
+                done += 1
+                if coords:
+                    house.latitude, house.longitude = coords
+                    store.save_house(house)
+                    console.print(f"({done}/{len(houses)}) {house.address} [green]✓[/green]")
+                    success += 1
+                else:
+                    console.print(f"({done}/{len(houses)}) {house.address} [red]✗[/red]")
+
+        batch_geocode(
+            list(by_address), on_result=on_result, cache_path=store.geocode_cache_file
+        )
 
         console.print(f"\n[cyan]Geocoded {success}/{len(houses)} houses[/cyan]")
 
@@ -530,16 +558,18 @@ def house_geocode(
 def house_report(
     output: str = typer.Option("report.html", "--output", "-o", help="Output file path"),
     open_browser: bool = typer.Option(True, "--open/--no-open", help="Open in browser after generating"),
+    compress: bool = typer.Option(False, "--gzip", help="Save a gzipped copy (OUTPUT.gz) instead"),
 ):
     """Generate an HTML report of all house evaluations."""
     from src.report import save_report
     import webbrowser
 
     console.print("[yellow]Generating report...[/yellow]")
-    path = save_report(output)
+    path = save_report(output, compress=compress)
     console.print(f"[green]✓ Report saved to: {path}[/green]")
 
-    if open_browser:
+    # Browsers can't open a gzipped file straight from disk
+    if open_browser and not compress:
         webbrowser.open(f"file://{path}")
 
 
@@ -551,6 +581,7 @@ def house_process(
     skip_geocode: bool = typer.Option(False, "--skip-geocode", help="Skip the geocoding step"),
     commit: bool = typer.Option(False, "--commit", "-c", help="Git commit and push after processing"),
     open_report: bool = typer.Option(False, "--open", help="Open report in browser when done"),
+    concurrency: int = typer.Option(5, "--concurrency", "-j", min=1, help="Number of houses scored at once"),
 ):
     """Process listings end-to-end: import, geocode, score, and generate report.
 
@@ -566,9 +597,12 @@ def house_process(
     """
     import subprocess
     from datetime import datetime
-    from src.services.geocoding import geocode_address
+    from src.models import House
+    from src.services.geocoding import batch_geocode
     from src.report import save_report
 
+    store = get_store()
+
     # Step 1: Import listings
     console.print("\n[bold cyan]━━━ Step 1: Importing Listings ━━━[/bold cyan]\n")
 
@@ -587,6 +621,7 @@ def house_process(
     imported = 0
     skipped = 0
     imported_ids = []
+    existing = store.existing_addresses()
 
     for listing in listings:
         address = listing.get("address", "")
@@ -595,7 +630,8 @@ def house_process(
             skipped += 1
             continue
 
-        if store.house_exists(address):
+        normalized = store.normalize_address(address)
+        if normalized in existing:
             console.print(f"  [dim]⊘ {address} - exists[/dim]")
             skipped += 1
             continue
@@ -619,6 +655,7 @@ def house_process(
             house.zip_code = listing["zip_code"]
 
         store.save_house(house)
+        existing.add(normalized)
         imported_ids.append(house_id)
         console.print(f"  [green]✓ {address}[/green]")
         imported += 1
@@ -644,16 +681,23 @@ def house_process(
         houses_to_geocode = [h for h in houses_to_geocode if h and (not h.latitude or not h.longitude)]
 
         if houses_to_geocode:
+            by_address = _group_by_address(houses_to_geocode)
             geocoded = 0
-            for house in houses_to_geocode:
-                coords = geocode_address(house.address)
-                if coords:
-                    house.latitude, house.longitude = coords
-                    store.save_house(house)
-                    console.print(f"  [green]✓ {house.address}[/green]")
-                    geocoded += 1
-                else:
-                    console.print(f"  [yellow]⚠ {house.address} - not found[/yellow]")
+
+            def on_result(address, coords):
+                nonlocal geocoded
+                for house in by_address[address]:
+                    if coords:
+                        house.latitude, house.longitude = coords
+                        store.save_house(house)
+                        console.print(f"  [green]✓ {house.address}[/green]")
+                        geocoded += 1
+                    else:
+                        console.print(f"  [yellow]⚠ {house.address} - not found[/yellow]")
+
+            batch_geocode(
+                list(by_address), on_result=on_result, cache_path=store.geocode_cache_file
+            )
             console.print(f"\n[cyan]Geocoded: {geocoded}/{len(houses_to_geocode)}[/cyan]")
         else:
             console.print("[dim]All houses already geocoded.[/dim]")
@@ -669,24 +713,8 @@ def house_process(
         houses_to_score = [h for h in houses_to_score if h and h.present_fit_score is None]
 
         if houses_to_score:
-            success = 0
-            for i, house in enumerate(houses_to_score, 1):
-                console.print(f"({i}/{len(houses_to_score)}) {house.address}")
-                try:
-                    result = orchestrator.score_house(house.id)
-                    if result:
-                        success += 1
-                        scored = store.load_house(house.id)
-                        if scored and scored.present_fit_score:
-                            pot = f"{scored.potential_score.score:.0f}" if scored.potential_score else "-"
-                            console.print(f"  [green]✓ Fit: {scored.present_fit_score.score:.0f} | Potential: {pot}[/green]")
-                    else:
-                        console.print(f"  [red]✗ Failed[/red]")
-                except Exception as e:
-                    console.print(f"  [red]✗ Error: {e}[/red]")
-
+            orchestrator.batch_score([h.id for h in houses_to_score], max_concurrency=concurrency)
             orchestrator.cleanup()
-            console.print(f"\n[cyan]Scored: {success}/{len(houses_to_score)}[/cyan]")
         else:
             console.print("[dim]All houses already scored.[/dim]")
 
@@ -729,9 +757,14 @@ def house_process(
 @taste_app.command("review")
 def taste_review():
     """Review recent decisions and propose taste updates."""
+    from rich.panel import Panel
+
+    from src.agents.base import AgentContext
     from src.agents.taste_curator import TasteCuratorAgent
 
-    agent = TasteCuratorAgent(store)
+    store = get_store()
+
+    agent = TasteCuratorAgent(AgentContext.create(store))
     proposals = agent.review_recent_decisions()
 
     if not proposals:
@@ -751,6 +784,8 @@ def taste_review():
 @app.command("help")
 def show_help():
     """Show detailed help with examples for all commands."""
+    from rich.markdown import Markdown
+    from rich.panel import Panel
     help_text = """
 # House Evaluator CLI
 
@@ -815,6 +850,9 @@ house batch-score
 
 # Re-score all houses
 house batch-score --all
+
+# Score up to 10 houses at once (default 5)
+house batch-score --concurrency 10
 ```
 
 ### house list
@@ -853,6 +891,9 @@ house report --output my-report.html
 
 # Don't open browser
 house report --no-open
+
+# Gzipped copy for uploading or serving (writes report.html.gz)
+house report --gzip
 ```
 
 ### house process
@@ -940,8 +981,10 @@ def main(ctx: typer.Context):
     Use 'help' for detailed usage examples.
     """
     if ctx.invoked_subcommand is None:
+        from rich.panel import Panel
+
         # Show quick summary when no command given
-        houses = store.list_houses()
+        houses = get_store().list_houses()
         scored = [h for h in houses if h.present_fit_score]
 
         console.print(Panel(
@@ -0,0 +1,11 @@
+"""Shared field types for the data models."""
+
+import sys
+from typing import Annotated
+
+from pydantic import AfterValidator
+
+# Enum-like labels (property type, feasibility, sentiment, ...) repeat across
+# every house and score; interning keeps one copy of each and makes == an
+# identity check in the common case
+Label = Annotated[str, AfterValidator(sys.intern)]
@@ -1,26 +1,42 @@
 """House data model."""
 
+import sys
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
+from .fields import Label
 from .scores import VisionAnalysis, PresentFitScore, PotentialScore
 
 
-class HouseFeatures(BaseModel):
-    """Structured features extracted from listing."""
+# Nested results and timestamps that from_trusted rebuilds from their JSON form
+_TRUSTED_RESULTS = (
+    ("vision_analysis", VisionAnalysis),
+    ("present_fit_score", PresentFitScore),
+    ("potential_score", PotentialScore),
+)
+_TIMESTAMP_FIELDS = ("ingested_at", "scored_at", "decided_at")
 
-    bedrooms: int | None = None
-    bathrooms: float | None = None
-    sqft: int | None = None
-    lot_sqft: int | None = None
-    year_built: int | None = None
-    property_type: str = ""  # single family, condo, townhouse
-    parking: str = ""  # garage, carport, street
-    hoa_fee: int | None = None
-    heating: str = ""
-    cooling: str = ""
-    flooring: list[str] = Field(default_factory=list)
-    appliances: list[str] = Field(default_factory=list)
+# Label fields repeat across a scan's houses; from_trusted interns them too,
+# since it skips the validators that would
+_LABEL_FIELDS = ("city", "state", "property_type", "parking", "heating", "cooling")
+_LABEL_LIST_FIELDS = ("flooring", "appliances")
+
+
+# Listing features, stored flat on House; older files nest them under "features"
+_FEATURE_FIELDS = frozenset({
+    "bedrooms", "bathrooms", "sqft", "lot_sqft", "year_built", "property_type",
+    "parking", "hoa_fee", "heating", "cooling", "flooring", "appliances",
+})
+
+
+def _lift_features(data: dict) -> dict:
+    """Move a nested "features" dict onto the house's own fields."""
+    features = data.get("features")
+    if not isinstance(features, dict):
+        return data
+    data = {k: v for k, v in data.items() if k != "features"}
+    data.update((k, v) for k, v in features.items() if k in _FEATURE_FIELDS)
+    return data
 
 
 class House(BaseModel):
@@ -32,8 +48,8 @@ class House(BaseModel):
 
     # Basic info
     address: str = Field(default="")
-    city: str = Field(default="")
-    state: str = Field(default="")
+    city: Label = Field(default="")
+    state: Label = Field(default="")
     zip_code: str = Field(default="")
 
     # Geolocation
@@ -44,8 +60,19 @@ class House(BaseModel):
     # Description
     description: str = Field(default="", description="Listing description text")
 
-    # Features
-    features: HouseFeatures = Field(default_factory=HouseFeatures)
+    # Features (structured data extracted from the listing)
+    bedrooms: int | None = None
+    bathrooms: float | None = None
+    sqft: int | None = None
+    lot_sqft: int | None = None
+    year_built: int | None = None
+    property_type: Label = ""  # single family, condo, townhouse
+    parking: Label = ""  # garage, carport, street
+    hoa_fee: int | None = None
+    heating: Label = ""
+    cooling: Label = ""
+    flooring: tuple[Label, ...] = ()
+    appliances: tuple[Label, ...] = ()
 
     # Images
     image_urls: list[str] = Field(default_factory=list, description="URLs of listing images")
@@ -63,6 +90,40 @@ class House(BaseModel):
     # Timestamps
     ingested_at: datetime = Field(default_factory=datetime.now)
     scored_at: datetime | None = None
+    decided_at: datetime | None = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _flatten_features(cls, data):
+        """Accept the nested "features" layout of older house files."""
+        return _lift_features(data) if isinstance(data, dict) else data
+
+    @property
+    def has_images(self) -> bool:
+        """Whether the listing has photos for vision analysis."""
+        return bool(self.image_urls)
+
+    @classmethod
+    def from_trusted(cls, data: dict) -> "House":
+        """Rebuild a house this app serialized itself, skipping validation.
+
+        Only for data written by the store; listing data from outside goes
+        through the normal constructor.
+        """
+        data = dict(_lift_features(data))
+        for key, model in _TRUSTED_RESULTS:
+            if data.get(key) is not None:
+                data[key] = model.from_trusted(data[key])
+        for key in _TIMESTAMP_FIELDS:
+            if isinstance(data.get(key), str):
+                data[key] = datetime.fromisoformat(data[key])
+        for key in _LABEL_FIELDS:
+            if isinstance(data.get(key), str):
+                data[key] = sys.intern(data[key])
+        for key in _LABEL_LIST_FIELDS:
+            if key in data:
+                data[key] = tuple(sys.intern(value) for value in data[key])
+        return cls.model_construct(**data)
 
     @classmethod
     def create_from_zillow(
@@ -83,5 +144,5 @@ class House(BaseModel):
             price=price,
             image_urls=image_urls,
             description=description,
-            features=HouseFeatures(**(features or {})),
+            features=features or {},
         )
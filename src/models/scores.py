@@ -1,14 +1,35 @@
-"""Scoring result models."""
+"""Scoring result models.
 
-from pydantic import BaseModel, Field
+Results are written once by an agent and only read afterwards, so their
+collections are tuples. Their scores are clamped to range by the agents
+that parse them, not validated here.
+"""
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from .fields import Label
+
+# Results are never modified after construction
+RESULT_CONFIG = ConfigDict(frozen=True)
+
+
+def _tuples(data: dict, *keys: str) -> dict:
+    """The given collection fields of serialized data as tuples.
+
+    from_trusted skips validation, which is what would turn the JSON lists
+    into the tuples the fields are declared as.
+    """
+    return {key: tuple(data.get(key, ())) for key in keys}
 
 
 class RoomAnalysis(BaseModel):
     """Analysis of a single room from vision."""
 
+    model_config = RESULT_CONFIG
+
     room_type: str = Field(description="Type of room (kitchen, living, bedroom, bathroom, exterior, etc.)")
-    aesthetic_quality: float = Field(ge=1, le=10, description="Overall aesthetic quality 1-10")
-    materials: list[str] = Field(default_factory=list, description="Visible materials (hardwood, granite, laminate, etc.)")
+    aesthetic_quality: float = Field(description="Overall aesthetic quality 1-10")
+    materials: tuple[str, ...] = Field(default=(), description="Visible materials (hardwood, granite, laminate, etc.)")
     light_quality: str = Field(default="", description="Natural light assessment (abundant, moderate, poor)")
     condition: str = Field(default="", description="Condition (original, updated, renovated, flip-quality)")
     notes: str = Field(default="", description="Additional observations")
@@ -17,51 +38,94 @@ class RoomAnalysis(BaseModel):
 class VisionAnalysis(BaseModel):
     """Complete vision analysis of a house."""
 
-    rooms: list[RoomAnalysis] = Field(default_factory=list)
-    overall_aesthetic: float = Field(ge=1, le=10, description="Overall aesthetic score 1-10")
+    model_config = RESULT_CONFIG
+
+    rooms: tuple[RoomAnalysis, ...] = Field(default=())
+    overall_aesthetic: float = Field(description="Overall aesthetic score 1-10")
     architectural_style: str = Field(default="", description="Architectural style if identifiable")
-    red_flags: list[str] = Field(default_factory=list, description="Concerning patterns (flip signs, cheap materials, etc.)")
-    positive_signals: list[str] = Field(default_factory=list, description="Positive aesthetic signals")
+    red_flags: tuple[str, ...] = Field(default=(), description="Concerning patterns (flip signs, cheap materials, etc.)")
+    positive_signals: tuple[str, ...] = Field(default=(), description="Positive aesthetic signals")
     renovation_state: str = Field(default="", description="Overall renovation state (original, partial, full, flip)")
     raw_description: str = Field(default="", description="Raw vision model output for reference")
 
+    @classmethod
+    def from_trusted(cls, data: dict) -> "VisionAnalysis":
+        """Rebuild an analysis this app serialized itself, skipping validation."""
+        rooms = tuple(
+            RoomAnalysis.model_construct(**{**room, **_tuples(room, "materials")})
+            for room in data.get("rooms", ())
+        )
+        return cls.model_construct(**{
+            **data,
+            **_tuples(data, "red_flags", "positive_signals"),
+            "rooms": rooms,
+        })
+
 
 class DimensionScore(BaseModel):
     """Score for a single aesthetic dimension."""
 
+    model_config = RESULT_CONFIG
+
     dimension: str
-    score: float = Field(ge=0, le=10)
-    weight: float = Field(ge=0, le=1)
+    score: float
+    weight: float
     notes: str = ""
 
 
 class PresentFitScore(BaseModel):
     """Present-fit scoring result - strict, penalty-oriented."""
 
-    score: float = Field(ge=0, le=100, description="Overall present-fit score 0-100")
+    model_config = RESULT_CONFIG
+
+    score: float = Field(description="Overall present-fit score 0-100")
     passed: bool = Field(description="Whether house passes minimum threshold")
-    violations: list[str] = Field(default_factory=list, description="Hard constraint violations")
-    dimension_scores: list[DimensionScore] = Field(default_factory=list)
+    violations: tuple[str, ...] = Field(default=(), description="Hard constraint violations")
+    dimension_scores: tuple[DimensionScore, ...] = Field(default=())
     justification: str = Field(default="", description="Brief explanation of score")
-    deal_breakers: list[str] = Field(default_factory=list, description="Absolute deal-breakers found")
+    deal_breakers: tuple[str, ...] = Field(default=(), description="Absolute deal-breakers found")
+
+    @classmethod
+    def from_trusted(cls, data: dict) -> "PresentFitScore":
+        """Rebuild a score this app serialized itself, skipping validation."""
+        dimension_scores = tuple(DimensionScore.model_construct(**d) for d in data.get("dimension_scores", ()))
+        return cls.model_construct(**{
+            **data,
+            **_tuples(data, "violations", "deal_breakers"),
+            "dimension_scores": dimension_scores,
+        })
 
 
 class RenovationIdea(BaseModel):
     """A potential renovation opportunity."""
 
+    model_config = RESULT_CONFIG
+
     area: str = Field(description="Area to renovate (kitchen, bathroom, etc.)")
     current_state: str = Field(description="Current condition")
     proposed_change: str = Field(description="What could be done")
     impact: str = Field(description="Expected aesthetic/value impact")
-    difficulty: str = Field(description="light, medium, or heavy")
+    difficulty: Label = Field(description="light, medium, or heavy")
 
 
 class PotentialScore(BaseModel):
     """Potential scoring result - transformation opportunities."""
 
-    score: float = Field(ge=0, le=100, description="Overall potential score 0-100")
-    renovation_ideas: list[RenovationIdea] = Field(default_factory=list)
-    feasibility: str = Field(description="Overall feasibility: light, medium, heavy")
-    cost_class: str = Field(description="Rough cost: <$50k, $50-100k, $100-200k, $200k+")
-    risk_notes: list[str] = Field(default_factory=list, description="Risks with renovation")
+    model_config = RESULT_CONFIG
+
+    score: float = Field(description="Overall potential score 0-100")
+    renovation_ideas: tuple[RenovationIdea, ...] = Field(default=())
+    feasibility: Label = Field(description="Overall feasibility: light, medium, heavy")
+    cost_class: Label = Field(description="Rough cost: <$50k, $50-100k, $100-200k, $200k+")
+    risk_notes: tuple[str, ...] = Field(default=(), description="Risks with renovation")
     upside_narrative: str = Field(default="", description="What this house could become")
+
+    @classmethod
+    def from_trusted(cls, data: dict) -> "PotentialScore":
+        """Rebuild a score this app serialized itself, skipping validation."""
+        ideas = tuple(RenovationIdea.model_construct(**idea) for idea in data.get("renovation_ideas", ()))
+        return cls.model_construct(**{
+            **data,
+            **_tuples(data, "risk_notes"),
+            "renovation_ideas": ideas,
+        })
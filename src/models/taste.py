@@ -2,15 +2,17 @@
 
 from pydantic import BaseModel, Field
 
+from .fields import Label
+
 
 class WeightedDimension(BaseModel):
     """A weighted aesthetic dimension."""
 
     name: str
-    weight: float = Field(ge=0, le=1, description="Importance weight 0-1")
+    weight: float = Field(description="Importance weight 0-1")
     description: str = Field(default="", description="What this dimension means")
-    positive_signals: list[str] = Field(default_factory=list)
-    negative_signals: list[str] = Field(default_factory=list)
+    positive_signals: tuple[str, ...] = ()
+    negative_signals: tuple[str, ...] = ()
 
 
 class Exemplar(BaseModel):
@@ -18,7 +20,7 @@ class Exemplar(BaseModel):
 
     house_id: str
     address: str = ""
-    sentiment: str = Field(description="liked or disliked")
+    sentiment: Label = Field(description="liked or disliked")
     reason: str = Field(default="", description="Why this is an exemplar")
 
 
@@ -67,7 +69,7 @@ class TasteModel(BaseModel):
     renovation_budget_max: int | None = Field(
         default=None, description="Maximum renovation budget in dollars"
     )
-    renovation_tolerance: str = Field(
+    renovation_tolerance: Label = Field(
         default="medium", description="Willingness to renovate: none, light, medium, heavy"
     )
 
@@ -75,60 +77,48 @@ class TasteModel(BaseModel):
     version: int = Field(default=1, description="Taste model version for tracking changes")
     notes: str = Field(default="", description="Free-form notes about preferences")
 
+    @classmethod
+    def from_trusted(cls, data: dict) -> "TasteModel":
+        """Rebuild a taste model this app serialized itself, skipping validation.
+
+        Only for data written by the store; anything from outside goes
+        through ``model_validate``.
+        """
+        return cls.model_construct(**{
+            **data,
+            # Signals are tuples, which model_construct won't convert JSON lists to
+            "dimensions": [
+                WeightedDimension.model_construct(**{
+                    **d,
+                    "positive_signals": tuple(d.get("positive_signals", ())),
+                    "negative_signals": tuple(d.get("negative_signals", ())),
+                })
+                for d in data.get("dimensions", ())
+            ],
+            "exemplars": [Exemplar.model_construct(**e) for e in data.get("exemplars", ())],
+        })
+
     @classmethod
     def create_empty(cls) -> "TasteModel":
         """Create an empty taste model for bootstrapping."""
-        return cls(
-            dimensions=[
-                WeightedDimension(
-                    name="natural_light",
-                    weight=0.15,
-                    description="Quality and abundance of natural light",
-                ),
-                WeightedDimension(
-                    name="materials_quality",
-                    weight=0.15,
-                    description="Quality of visible materials and finishes",
-                ),
-                WeightedDimension(
-                    name="layout_flow",
-                    weight=0.12,
-                    description="How well spaces flow and connect",
-                ),
-                WeightedDimension(
-                    name="architectural_character",
-                    weight=0.12,
-                    description="Architectural interest and character",
-                ),
-                WeightedDimension(
-                    name="kitchen_quality",
-                    weight=0.12,
-                    description="Kitchen design and functionality",
-                ),
-                WeightedDimension(
-                    name="outdoor_space",
-                    weight=0.10,
-                    description="Quality of outdoor spaces and views",
-                ),
-                WeightedDimension(
-                    name="proportions",
-                    weight=0.08,
-                    description="Room proportions and ceiling heights",
-                ),
-                WeightedDimension(
-                    name="condition",
-                    weight=0.08,
-                    description="Overall maintenance and condition",
-                ),
-                WeightedDimension(
-                    name="storage",
-                    weight=0.04,
-                    description="Storage space availability",
-                ),
-                WeightedDimension(
-                    name="privacy",
-                    weight=0.04,
-                    description="Privacy from neighbors and street",
-                ),
-            ]
-        )
+        # Dimensions are mutable models; give each taste model its own
+        return cls(dimensions=[d.model_copy() for d in _DEFAULT_DIMENSIONS])
+
+
+# Starting dimensions for a new taste model. Built once; each new model gets
+# shallow copies, which pydantic accepts as they are instead of re-validating.
+_DEFAULT_DIMENSIONS = tuple(
+    WeightedDimension.model_construct(name=name, weight=weight, description=description)
+    for name, weight, description in (
+        ("natural_light", 0.15, "Quality and abundance of natural light"),
+        ("materials_quality", 0.15, "Quality of visible materials and finishes"),
+        ("layout_flow", 0.12, "How well spaces flow and connect"),
+        ("architectural_character", 0.12, "Architectural interest and character"),
+        ("kitchen_quality", 0.12, "Kitchen design and functionality"),
+        ("outdoor_space", 0.10, "Quality of outdoor spaces and views"),
+        ("proportions", 0.08, "Room proportions and ceiling heights"),
+        ("condition", 0.08, "Overall maintenance and condition"),
+        ("storage", 0.04, "Storage space availability"),
+        ("privacy", 0.04, "Privacy from neighbors and street"),
+    )
+)
@@ -1,39 +1,20 @@
 """Generate HTML report of house evaluations."""
 
-import html
-import json
+import gzip
+import io
+import re
 from datetime import datetime
 from pathlib import Path
+from typing import Callable
 
-from src.storage import JsonStore
-
+import orjson
 
-def html_escape_for_attr(text: str) -> str:
-    """Escape text for use in HTML attribute, preserving newlines as escaped chars."""
-    if not text:
-        return ""
-    # Escape HTML entities and encode newlines for data attribute
-    escaped = html.escape(text, quote=True)
-    # Replace newlines with a marker we can decode in JS
-    escaped = escaped.replace("\n", "&#10;")
-    return escaped
-
-
-def generate_report() -> str:
-    """Generate an HTML report of all scored houses."""
-    store = JsonStore()
-    houses = store.list_houses()
-
-    # Sort by present_fit_score descending
-    houses.sort(
-        key=lambda h: h.present_fit_score.score if h.present_fit_score else 0,
-        reverse=True
-    )
+from src.storage import JsonStore
 
-    # Get houses with coordinates for the map
-    houses_with_coords = [h for h in houses if h.latitude and h.longitude]
 
-    html = f"""<!DOCTYPE html>
+# Page head with the stylesheet; nothing in it varies between reports. Kept
+# readable here and minified once into _HEAD_HTML below.
+_HEAD_HTML_SRC = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -43,7 +24,7 @@ def generate_report() -> str:
     <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
     <script src="https://cdn.jsdelivr.net/npm/marked/marked.min.js"></script>
     <style>
-        :root {{
+        :root {
             --bg-primary: #0f172a;
             --bg-secondary: #1e293b;
             --bg-card: #334155;
@@ -54,35 +35,35 @@ def generate_report() -> str:
             --accent-red: #ef4444;
             --accent-blue: #3b82f6;
             --accent-purple: #a855f7;
-        }}
+        }
 
-        * {{
+        * {
             box-sizing: border-box;
             margin: 0;
             padding: 0;
-        }}
+        }
 
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
             background: var(--bg-primary);
             color: var(--text-primary);
             line-height: 1.6;
             padding: 2rem;
-        }}
+        }
 
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
-        }}
+        }
 
-        header {{
+        header {
             text-align: center;
             margin-bottom: 3rem;
             padding-bottom: 2rem;
             border-bottom: 1px solid var(--bg-card);
-        }}
+        }
 
-        h1 {{
+        h1 {
             font-size: 2.5rem;
             font-weight: 700;
             margin-bottom: 0.5rem;
@@ -90,105 +71,105 @@ def generate_report() -> str:
             -webkit-background-clip: text;
             -webkit-text-fill-color: transparent;
             background-clip: text;
-        }}
+        }
 
-        .subtitle {{
+        .subtitle {
             color: var(--text-secondary);
             font-size: 1.1rem;
-        }}
+        }
 
-        .summary {{
+        .summary {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 1rem;
             margin-bottom: 3rem;
-        }}
+        }
 
-        .stat-card {{
+        .stat-card {
             background: var(--bg-secondary);
             padding: 1.5rem;
             border-radius: 12px;
             text-align: center;
-        }}
+        }
 
-        .stat-value {{
+        .stat-value {
             font-size: 2.5rem;
             font-weight: 700;
             color: var(--accent-blue);
-        }}
+        }
 
-        .stat-label {{
+        .stat-label {
             color: var(--text-secondary);
             font-size: 0.9rem;
             text-transform: uppercase;
             letter-spacing: 0.05em;
-        }}
+        }
 
-        .houses {{
+        .houses {
             display: flex;
             flex-direction: column;
             gap: 2rem;
-        }}
+        }
 
-        .house-card {{
+        .house-card {
             background: var(--bg-secondary);
             border-radius: 16px;
             overflow: hidden;
             display: grid;
             grid-template-columns: 300px 1fr;
             transition: transform 0.2s, box-shadow 0.2s;
-        }}
+        }
 
-        .house-card:hover {{
+        .house-card:hover {
             transform: translateY(-2px);
             box-shadow: 0 10px 40px rgba(0,0,0,0.3);
-        }}
+        }
 
-        .house-image {{
+        .house-image {
             width: 300px;
             height: 250px;
             object-fit: cover;
             background: var(--bg-card);
-        }}
+        }
 
-        .house-content {{
+        .house-content {
             padding: 1.5rem;
             display: flex;
             flex-direction: column;
-        }}
+        }
 
-        .house-header {{
+        .house-header {
             display: flex;
             justify-content: space-between;
             align-items: flex-start;
             margin-bottom: 1rem;
-        }}
+        }
 
-        .house-address {{
+        .house-address {
             font-size: 1.4rem;
             font-weight: 600;
             margin-bottom: 0.25rem;
-        }}
+        }
 
-        .house-price {{
+        .house-price {
             font-size: 1.2rem;
             color: var(--accent-green);
             font-weight: 600;
-        }}
+        }
 
-        .house-features {{
+        .house-features {
             color: var(--text-secondary);
             font-size: 0.9rem;
             margin-bottom: 1rem;
-        }}
+        }
 
-        .scores {{
+        .scores {
             display: flex;
             gap: 1rem;
             margin-bottom: 1rem;
-        }}
+        }
 
-        .score-badge {{
+        .score-badge {
             display: flex;
             flex-direction: column;
             align-items: center;
@@ -196,25 +177,25 @@ def generate_report() -> str:
             padding: 0.75rem 1.25rem;
             border-radius: 8px;
             min-width: 100px;
-        }}
+        }
 
-        .score-value {{
+        .score-value {
             font-size: 1.8rem;
             font-weight: 700;
-        }}
+        }
 
-        .score-label {{
+        .score-label {
             font-size: 0.75rem;
             color: var(--text-secondary);
             text-transform: uppercase;
             letter-spacing: 0.05em;
-        }}
+        }
 
-        .score-high {{ color: var(--accent-green); }}
-        .score-medium {{ color: var(--accent-yellow); }}
-        .score-low {{ color: var(--accent-red); }}
+        .score-high { color: var(--accent-green); }
+        .score-medium { color: var(--accent-yellow); }
+        .score-low { color: var(--accent-red); }
 
-        .justification {{
+        .justification {
             background: var(--bg-card);
             padding: 1rem;
             border-radius: 8px;
@@ -222,50 +203,50 @@ def generate_report() -> str:
             color: var(--text-secondary);
             margin-bottom: 1rem;
             flex-grow: 1;
-        }}
+        }
 
-        .tags {{
+        .tags {
             display: flex;
             flex-wrap: wrap;
             gap: 0.5rem;
-        }}
+        }
 
-        .tag {{
+        .tag {
             background: var(--bg-card);
             padding: 0.25rem 0.75rem;
             border-radius: 20px;
             font-size: 0.8rem;
-        }}
+        }
 
-        .tag-positive {{
+        .tag-positive {
             background: rgba(34, 197, 94, 0.2);
             color: var(--accent-green);
-        }}
+        }
 
-        .tag-negative {{
+        .tag-negative {
             background: rgba(239, 68, 68, 0.2);
             color: var(--accent-red);
-        }}
+        }
 
-        .house-link {{
+        .house-link {
             display: inline-block;
             margin-top: 1rem;
             color: var(--accent-blue);
             text-decoration: none;
             font-size: 0.9rem;
-        }}
+        }
 
-        .house-link:hover {{
+        .house-link:hover {
             text-decoration: underline;
-        }}
+        }
 
-        .brief-section {{
+        .brief-section {
             margin-top: 1rem;
             padding-top: 1rem;
             border-top: 1px solid var(--bg-card);
-        }}
+        }
 
-        .brief-toggle {{
+        .brief-toggle {
             background: var(--bg-card);
             border: none;
             color: var(--text-primary);
@@ -273,13 +254,13 @@ def generate_report() -> str:
             border-radius: 6px;
             cursor: pointer;
             font-size: 0.9rem;
-        }}
+        }
 
-        .brief-toggle:hover {{
+        .brief-toggle:hover {
             background: var(--bg-primary);
-        }}
+        }
 
-        .brief-content {{
+        .brief-content {
             display: none;
             margin-top: 1rem;
             padding: 1.5rem;
@@ -287,135 +268,135 @@ def generate_report() -> str:
             border-radius: 8px;
             font-size: 0.95rem;
             line-height: 1.7;
-        }}
+        }
 
-        .brief-content.show {{
+        .brief-content.show {
             display: block;
-        }}
+        }
 
         /* Markdown rendered content styles */
-        .brief-content h1 {{
+        .brief-content h1 {
             font-size: 1.4rem;
             font-weight: 700;
             margin: 0 0 1rem 0;
             padding-bottom: 0.5rem;
             border-bottom: 1px solid var(--bg-secondary);
             color: var(--text-primary);
-        }}
+        }
 
-        .brief-content h2 {{
+        .brief-content h2 {
             font-size: 1.1rem;
             font-weight: 600;
             margin: 1.5rem 0 0.75rem 0;
             color: var(--accent-blue);
-        }}
+        }
 
-        .brief-content h3 {{
+        .brief-content h3 {
             font-size: 1rem;
             font-weight: 600;
             margin: 1rem 0 0.5rem 0;
             color: var(--text-primary);
-        }}
+        }
 
-        .brief-content p {{
+        .brief-content p {
             margin: 0.75rem 0;
             color: var(--text-secondary);
-        }}
+        }
 
-        .brief-content ul, .brief-content ol {{
+        .brief-content ul, .brief-content ol {
             margin: 0.75rem 0;
             padding-left: 1.5rem;
             color: var(--text-secondary);
-        }}
+        }
 
-        .brief-content li {{
+        .brief-content li {
             margin: 0.4rem 0;
-        }}
+        }
 
-        .brief-content strong {{
+        .brief-content strong {
             color: var(--text-primary);
             font-weight: 600;
-        }}
+        }
 
-        .brief-content em {{
+        .brief-content em {
             font-style: italic;
-        }}
+        }
 
-        .brief-content blockquote {{
+        .brief-content blockquote {
             border-left: 3px solid var(--accent-purple);
             margin: 1rem 0;
             padding: 0.5rem 1rem;
             background: rgba(168, 85, 247, 0.1);
             border-radius: 0 8px 8px 0;
-        }}
+        }
 
-        .brief-content code {{
+        .brief-content code {
             background: var(--bg-secondary);
             padding: 0.2rem 0.4rem;
             border-radius: 4px;
             font-family: monospace;
             font-size: 0.85em;
-        }}
+        }
 
-        .renovation-ideas {{
+        .renovation-ideas {
             margin-top: 1rem;
-        }}
+        }
 
-        .renovation-idea {{
+        .renovation-idea {
             background: rgba(168, 85, 247, 0.1);
             border-left: 3px solid var(--accent-purple);
             padding: 0.75rem;
             margin-bottom: 0.5rem;
             border-radius: 0 8px 8px 0;
-        }}
+        }
 
-        .renovation-area {{
+        .renovation-area {
             font-weight: 600;
             color: var(--accent-purple);
-        }}
+        }
 
-        .renovation-change {{
+        .renovation-change {
             font-size: 0.9rem;
             color: var(--text-secondary);
-        }}
+        }
 
-        footer {{
+        footer {
             text-align: center;
             margin-top: 3rem;
             padding-top: 2rem;
             border-top: 1px solid var(--bg-card);
             color: var(--text-secondary);
             font-size: 0.9rem;
-        }}
+        }
 
         /* Map styles */
-        .map-section {{
+        .map-section {
             margin-bottom: 3rem;
-        }}
+        }
 
-        .map-header {{
+        .map-header {
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-bottom: 1rem;
             flex-wrap: wrap;
             gap: 1rem;
-        }}
+        }
 
-        .map-controls {{
+        .map-controls {
             display: flex;
             gap: 1rem;
             align-items: center;
-        }}
+        }
 
-        .score-toggle {{
+        .score-toggle {
             display: flex;
             background: var(--bg-secondary);
             border-radius: 8px;
             overflow: hidden;
-        }}
+        }
 
-        .score-toggle-btn {{
+        .score-toggle-btn {
             background: transparent;
             border: none;
             color: var(--text-secondary);
@@ -423,23 +404,23 @@ def generate_report() -> str:
             cursor: pointer;
             font-size: 0.85rem;
             transition: all 0.2s;
-        }}
+        }
 
-        .score-toggle-btn:hover {{
+        .score-toggle-btn:hover {
             color: var(--text-primary);
-        }}
+        }
 
-        .score-toggle-btn.active {{
+        .score-toggle-btn.active {
             background: var(--accent-blue);
             color: white;
-        }}
+        }
 
-        .map-title {{
+        .map-title {
             font-size: 1.5rem;
             font-weight: 600;
-        }}
+        }
 
-        .map-toggle {{
+        .map-toggle {
             background: var(--bg-secondary);
             border: 1px solid var(--bg-card);
             color: var(--text-primary);
@@ -448,257 +429,216 @@ def generate_report() -> str:
             cursor: pointer;
             font-size: 0.9rem;
             transition: background 0.2s;
-        }}
+        }
 
-        .map-toggle:hover {{
+        .map-toggle:hover {
             background: var(--bg-card);
-        }}
+        }
 
-        #map {{
+        #map {
             height: 500px;
             border-radius: 12px;
             z-index: 1;
-        }}
+        }
 
-        .map-container.collapsed #map {{
+        .map-container.collapsed #map {
             display: none;
-        }}
+        }
 
-        .leaflet-popup-content {{
+        .leaflet-popup-content {
             margin: 0;
             min-width: 200px;
-        }}
+        }
 
-        .popup-container {{
+        .marker-dot {
+            width: 30px;
+            height: 30px;
+            border-radius: 50%;
+            border: 3px solid white;
+            box-shadow: 0 2px 5px rgba(0,0,0,0.3);
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            color: white;
+            font-weight: bold;
+            font-size: 11px;
+        }
+
+        .popup-container {
             display: flex;
             flex-direction: column;
-        }}
+        }
 
-        .popup-thumbnail {{
+        .popup-thumbnail {
             width: 100%;
             height: 120px;
             object-fit: cover;
             border-radius: 4px 4px 0 0;
-        }}
+        }
 
-        .popup-info {{
+        .popup-info {
             padding: 10px 12px;
-        }}
+        }
 
-        .popup-address {{
+        .popup-address {
             font-weight: 600;
             font-size: 0.95rem;
             margin-bottom: 4px;
             color: #1e293b;
-        }}
+        }
 
-        .popup-price {{
+        .popup-price {
             color: #22c55e;
             font-weight: 600;
             margin-bottom: 6px;
             font-size: 1rem;
-        }}
+        }
 
-        .popup-scores {{
+        .popup-scores {
             font-size: 0.85rem;
             color: #64748b;
             margin-bottom: 8px;
-        }}
+        }
 
-        .popup-scores span {{
+        .popup-scores span {
             display: inline-block;
             padding: 2px 8px;
             border-radius: 4px;
             margin-right: 4px;
             font-weight: 500;
-        }}
+        }
 
-        .popup-scores .fit-badge {{
+        .popup-scores .fit-badge {
             background: rgba(59, 130, 246, 0.1);
             color: #3b82f6;
-        }}
+        }
 
-        .popup-scores .potential-badge {{
+        .popup-scores .potential-badge {
             background: rgba(168, 85, 247, 0.1);
             color: #a855f7;
-        }}
+        }
 
-        .popup-link {{
+        .popup-link {
             display: block;
             color: #3b82f6;
             text-decoration: none;
             font-size: 0.85rem;
-        }}
+        }
 
-        .popup-link:hover {{
+        .popup-link:hover {
             text-decoration: underline;
-        }}
+        }
 
-        @media (max-width: 768px) {{
-            .house-card {{
+        @media (max-width: 768px) {
+            .house-card {
                 grid-template-columns: 1fr;
-            }}
+            }
 
-            .house-image {{
+            .house-image {
                 width: 100%;
                 height: 200px;
-            }}
+            }
 
-            #map {{
+            #map {
                 height: 350px;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
-<body>
-    <div class="container">
-        <header>
-            <h1>House Evaluation Report</h1>
-            <p class="subtitle">Generated {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
-        </header>
+"""
+
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+_CSS_PUNCT_SPACE_RE = re.compile(r"\s*([{};,])\s*")
+_STYLE_BLOCK_RE = re.compile(r"(?<=<style>).*?(?=</style>)", re.DOTALL)
+
+
+def minify_css(css: str) -> str:
+    """Drop comments and the whitespace the browser ignores from a stylesheet.
+
+    Spaces before ':' are kept, since one there can be a descendant
+    combinator (".card :hover").
+    """
+    css = _CSS_COMMENT_RE.sub("", css)
+    css = _WHITESPACE_RE.sub(" ", css)
+    css = _CSS_PUNCT_SPACE_RE.sub(r"\1", css)
+    return css.replace(": ", ":").strip()
+
+
+_HEAD_HTML = _STYLE_BLOCK_RE.sub(lambda m: minify_css(m.group()), _HEAD_HTML_SRC)
 
-        <div class="summary">
+
+# Stat cards under the report header
+_SUMMARY_HTML = """<div class="summary">
             <div class="stat-card">
-                <div class="stat-value">{len(houses)}</div>
+                <div class="stat-value">{house_count}</div>
                 <div class="stat-label">Houses Evaluated</div>
             </div>
             <div class="stat-card">
-                <div class="stat-value">{len([h for h in houses if h.present_fit_score and h.present_fit_score.score >= 70])}</div>
+                <div class="stat-value">{strong_matches}</div>
                 <div class="stat-label">Strong Matches (70+)</div>
             </div>
             <div class="stat-card">
-                <div class="stat-value">${min(h.price for h in houses if h.price) / 1000:.0f}k - ${max(h.price for h in houses if h.price) / 1000:.0f}k</div>
+                <div class="stat-value">{price_range}</div>
                 <div class="stat-label">Price Range</div>
             </div>
             <div class="stat-card">
-                <div class="stat-value">{len([h for h in houses if h.potential_score and h.potential_score.score >= 80])}</div>
+                <div class="stat-value">{high_potential}</div>
                 <div class="stat-label">High Potential (80+)</div>
             </div>
-        </div>
+        </div>"""
 
-        {"" if not houses_with_coords else f'''
-        <div class="map-section">
-            <div class="map-header">
-                <span class="map-title">📍 Map View ({len(houses_with_coords)} locations)</span>
-                <div class="map-controls">
-                    <div class="score-toggle">
-                        <button class="score-toggle-btn active" data-score="fit" onclick="setScoreMode(\'fit\')">Fit Score</button>
-                        <button class="score-toggle-btn" data-score="potential" onclick="setScoreMode(\'potential\')">Potential</button>
-                    </div>
-                    <button class="map-toggle" onclick="toggleMap()">Hide Map</button>
-                </div>
-            </div>
-            <div class="map-container" id="map-container">
-                <div id="map"></div>
-            </div>
-        </div>
-        '''}
 
-        <div class="houses">
-"""
+# HTML entities for a data attribute, with newlines encoded as a marker we can
+# decode in JS; str.translate applies them all in one pass
+_ATTR_ESCAPES = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+    "\n": "&#10;",
+})
+_ATTR_UNSAFE_RE = re.compile(r"[&<>\"'\n]")
 
-    for i, house in enumerate(houses):
-        fit_score = house.present_fit_score.score if house.present_fit_score else 0
-        pot_score = house.potential_score.score if house.potential_score else 0
 
-        # Determine score color class
-        if fit_score >= 75:
-            fit_class = "score-high"
-        elif fit_score >= 60:
-            fit_class = "score-medium"
-        else:
-            fit_class = "score-low"
-
-        if pot_score >= 80:
-            pot_class = "score-high"
-        elif pot_score >= 65:
-            pot_class = "score-medium"
-        else:
-            pot_class = "score-low"
+def html_escape_for_attr(text: str) -> str:
+    """Escape text for use in HTML attribute, preserving newlines as escaped chars."""
+    if not text:
+        return ""
+    # Most fields have nothing to escape; skip the copy for them
+    if _ATTR_UNSAFE_RE.search(text) is None:
+        return text
+    return text.translate(_ATTR_ESCAPES)
 
-        # Get first image or placeholder
-        image_url = house.image_urls[0] if house.image_urls else ""
 
-        # Features text
-        features = []
-        if house.features.bedrooms:
-            features.append(f"{house.features.bedrooms} bed")
-        if house.features.bathrooms:
-            features.append(f"{house.features.bathrooms:.0f} bath")
-        if house.features.sqft:
-            features.append(f"{house.features.sqft:,} sqft")
-        features_text = " · ".join(features)
+# Score levels: high at or above the first cutoff, medium at or above the second
+FIT_CUTOFFS = (75, 60)
+POTENTIAL_CUTOFFS = (80, 65)
 
-        # Justification
-        justification = ""
-        if house.present_fit_score:
-            justification = house.present_fit_score.justification
+# Card class and marker color for each level (high, medium, low)
+SCORE_CLASSES = ("score-high", "score-medium", "score-low")
+MARKER_COLORS = ("#22c55e", "#eab308", "#ef4444")  # green, yellow, red
 
-        # Tags from vision analysis
-        positive_tags = []
-        negative_tags = []
-        if house.vision_analysis:
-            positive_tags = house.vision_analysis.positive_signals[:3]
-            negative_tags = house.vision_analysis.red_flags[:3]
 
-        # Renovation ideas
-        renovation_html = ""
-        if house.potential_score and house.potential_score.renovation_ideas:
-            renovation_html = '<div class="renovation-ideas">'
-            for idea in house.potential_score.renovation_ideas[:2]:
-                renovation_html += f'''
-                <div class="renovation-idea">
-                    <div class="renovation-area">{idea.area}</div>
-                    <div class="renovation-change">{idea.proposed_change}</div>
-                </div>'''
-            renovation_html += '</div>'
+def score_level(score: float, cutoffs: tuple[int, int]) -> int:
+    """Index of a score's level in SCORE_CLASSES / MARKER_COLORS."""
+    high, medium = cutoffs
+    return 0 if score >= high else 1 if score >= medium else 2
 
-        html += f"""
-            <div class="house-card">
-                <img src="{image_url}" alt="{house.address}" class="house-image" onerror="this.style.display='none'">
-                <div class="house-content">
-                    <div class="house-header">
-                        <div>
-                            <div class="house-address">{house.address}</div>
-                            <div class="house-price">${house.price:,}</div>
-                            <div class="house-features">{features_text}</div>
-                        </div>
-                        <div class="scores">
-                            <div class="score-badge">
-                                <div class="score-value {fit_class}">{fit_score:.0f}</div>
-                                <div class="score-label">Fit Score</div>
-                            </div>
-                            <div class="score-badge">
-                                <div class="score-value {pot_class}">{pot_score:.0f}</div>
-                                <div class="score-label">Potential</div>
-                            </div>
-                        </div>
-                    </div>
 
-                    <div class="justification">{justification}</div>
+def script_json(data) -> str:
+    """Serialize data as a JSON literal safe to embed in an inline <script>.
 
-                    <div class="tags">
-                        {"".join(f'<span class="tag tag-positive">✓ {tag}</span>' for tag in positive_tags)}
-                        {"".join(f'<span class="tag tag-negative">✗ {tag}</span>' for tag in negative_tags)}
-                    </div>
+    JSON already quotes and escapes every string for JS; the one sequence left
+    to break is "</", which could close the script element early.
+    """
+    return orjson.dumps(data).decode().replace("</", "<\\/")
 
-                    {renovation_html}
-
-                    <a href="{house.url}" target="_blank" class="house-link">View on Zillow →</a>
 
-                    <div class="brief-section">
-                        <button class="brief-toggle" onclick="toggleBrief(this)">
-                            Show Full Brief
-                        </button>
-                        <div class="brief-content" data-markdown="{html_escape_for_attr(house.brief) if house.brief else ''}">
-                            {('No brief generated' if not house.brief else '')}
-                        </div>
-                    </div>
-                </div>
-            </div>
-"""
-
-    html += """
+# Footer and page-level script, emitted after the house cards unchanged
+_FOOTER_HTML = """
         </div>
 
         <footer>
@@ -743,171 +683,339 @@ def generate_report() -> str:
     </script>
 """
 
-    # Add map initialization script if we have geocoded houses
-    if houses_with_coords:
-        # Calculate map center (average of all coordinates)
-        avg_lat = sum(h.latitude for h in houses_with_coords) / len(houses_with_coords)
-        avg_lng = sum(h.longitude for h in houses_with_coords) / len(houses_with_coords)
-
-        # Generate markers data
-        markers_js = []
-        for h in houses_with_coords:
-            fit_score = h.present_fit_score.score if h.present_fit_score else 0
-            pot_score = h.potential_score.score if h.potential_score else 0
-
-            # Color based on fit score
-            if fit_score >= 75:
-                fit_color = "#22c55e"  # green
-            elif fit_score >= 60:
-                fit_color = "#eab308"  # yellow
-            else:
-                fit_color = "#ef4444"  # red
-
-            # Color based on potential score
-            if pot_score >= 80:
-                pot_color = "#22c55e"  # green
-            elif pot_score >= 65:
-                pot_color = "#eab308"  # yellow
-            else:
-                pot_color = "#ef4444"  # red
-
-            # Escape quotes in address
-            safe_address = h.address.replace("'", "\\'").replace('"', '\\"')
-            price_str = f"${h.price:,}" if h.price else "N/A"
-
-            # Get thumbnail (first image)
-            thumbnail = h.image_urls[0] if h.image_urls else ""
-
-            markers_js.append(f"""
-            {{
-                lat: {h.latitude},
-                lng: {h.longitude},
-                address: "{safe_address}",
-                price: "{price_str}",
-                fit: {fit_score:.0f},
-                potential: {pot_score:.0f},
-                fitColor: "{fit_color}",
-                potColor: "{pot_color}",
-                url: "{h.url}",
-                thumbnail: "{thumbnail}"
-            }}""")
-
-        markers_data = ",".join(markers_js)
-
-        html += f"""
-    <script>
-        // Initialize Leaflet map
-        const map = L.map('map').setView([{avg_lat}, {avg_lng}], 11);
-        window.map = map;
-
-        // Add OpenStreetMap tiles
-        L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
-            attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
-        }}).addTo(map);
-
-        // House markers data
-        const houses = [{markers_data}
-        ];
+# Map header and container; only the location count is filled in per report
+_MAP_SECTION_HTML = """
+        <div class="map-section">
+            <div class="map-header">
+                <span class="map-title">📍 Map View ({count} locations)</span>
+                <div class="map-controls">
+                    <div class="score-toggle">
+                        <button class="score-toggle-btn active" data-score="fit" onclick="setScoreMode('fit')">Fit Score</button>
+                        <button class="score-toggle-btn" data-score="potential" onclick="setScoreMode('potential')">Potential</button>
+                    </div>
+                    <button class="map-toggle" onclick="toggleMap()">Hide Map</button>
+                </div>
+            </div>
+            <div class="map-container" id="map-container">
+                <div id="map"></div>
+            </div>
+        </div>
+        """
 
+# Marker, popup and score-toggle script. It reads the `houses` and `map`
+# globals declared by the per-report script written just before it.
+_MAP_SCRIPT_JS = """
         // Track current score mode and markers
         let currentScoreMode = 'fit';
         const markers = [];
 
         // Function to create marker icon
-        function createMarkerIcon(house, mode) {{
+        function createMarkerIcon(house, mode) {
             const score = mode === 'fit' ? house.fit : house.potential;
             const color = mode === 'fit' ? house.fitColor : house.potColor;
-            const markerHtml = `
-                <div style="
-                    background: ${{color}};
-                    width: 30px;
-                    height: 30px;
-                    border-radius: 50%;
-                    border: 3px solid white;
-                    box-shadow: 0 2px 5px rgba(0,0,0,0.3);
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    color: white;
-                    font-weight: bold;
-                    font-size: 11px;
-                ">${{score}}</div>
-            `;
-            return L.divIcon({{
-                html: markerHtml,
+            return L.divIcon({
+                html: `<div class="marker-dot" style="background: ${color}">${score}</div>`,
                 className: 'custom-marker',
                 iconSize: [30, 30],
                 iconAnchor: [15, 15]
-            }});
-        }}
+            });
+        }
 
         // Add markers for each house
-        houses.forEach(house => {{
+        houses.forEach(house => {
             const icon = createMarkerIcon(house, currentScoreMode);
-            const marker = L.marker([house.lat, house.lng], {{ icon }}).addTo(map);
+            const marker = L.marker([house.lat, house.lng], { icon }).addTo(map);
 
             // Create popup content with thumbnail
             const thumbnailHtml = house.thumbnail
-                ? `<img src="${{house.thumbnail}}" class="popup-thumbnail" alt="${{house.address}}" onerror="this.style.display='none'">`
+                ? `<img src="${house.thumbnail}" class="popup-thumbnail" alt="${house.address}" onerror="this.style.display='none'">`
                 : '';
 
             const popupContent = `
                 <div class="popup-container">
-                    ${{thumbnailHtml}}
+                    ${thumbnailHtml}
                     <div class="popup-info">
-                        <div class="popup-address">${{house.address}}</div>
-                        <div class="popup-price">${{house.price}}</div>
+                        <div class="popup-address">${house.address}</div>
+                        <div class="popup-price">${house.price}</div>
                         <div class="popup-scores">
-                            <span class="fit-badge">Fit: ${{house.fit}}</span>
-                            <span class="potential-badge">Potential: ${{house.potential}}</span>
+                            <span class="fit-badge">Fit: ${house.fit}</span>
+                            <span class="potential-badge">Potential: ${house.potential}</span>
                         </div>
-                        <a href="${{house.url}}" target="_blank" class="popup-link">View on Zillow →</a>
+                        <a href="${house.url}" target="_blank" class="popup-link">View on Zillow →</a>
                     </div>
                 </div>
             `;
 
-            marker.bindPopup(popupContent, {{ maxWidth: 250 }});
+            marker.bindPopup(popupContent, { maxWidth: 250 });
             marker.houseData = house;
             markers.push(marker);
-        }});
+        });
 
         // Function to update all markers when score mode changes
-        function setScoreMode(mode) {{
+        function setScoreMode(mode) {
             currentScoreMode = mode;
 
             // Update button states
-            document.querySelectorAll('.score-toggle-btn').forEach(btn => {{
+            document.querySelectorAll('.score-toggle-btn').forEach(btn => {
                 btn.classList.toggle('active', btn.dataset.score === mode);
-            }});
+            });
 
             // Update all marker icons
-            markers.forEach(marker => {{
+            markers.forEach(marker => {
                 const newIcon = createMarkerIcon(marker.houseData, mode);
                 marker.setIcon(newIcon);
-            }});
-        }}
+            });
+        }
 
         // Fit map to show all markers
-        if (houses.length > 0) {{
+        if (houses.length > 0) {
             const bounds = L.latLngBounds(houses.map(h => [h.lat, h.lng]));
-            map.fitBounds(bounds, {{ padding: [50, 50] }});
-        }}
+            map.fitBounds(bounds, { padding: [50, 50] });
+        }
     </script>
 """
 
-    html += """
+
+def generate_report() -> str:
+    """Generate an HTML report of all scored houses."""
+    buf = io.StringIO()
+    stream_report(buf.write)
+    return buf.getvalue()
+
+
+def stream_report(write: Callable[[str], object]) -> None:
+    """Generate the HTML report of all scored houses, passing it to write in chunks."""
+    store = JsonStore()
+    houses = store.list_houses()
+
+    # Sort by present_fit_score descending; the scores are read in one
+    # comprehension and fetched by the sort through a C method, not a lambda
+    fit_keys = [h.present_fit_score.score if h.present_fit_score else 0 for h in houses]
+    order = sorted(range(len(houses)), key=fit_keys.__getitem__, reverse=True)
+    houses = [houses[i] for i in order]
+
+    # Get houses with coordinates for the map
+    houses_with_coords = [h for h in houses if h.latitude and h.longitude]
+
+    # Summary stats, gathered in one pass over the houses
+    strong_matches = 0
+    high_potential = 0
+    price_min = price_max = None
+    for h in houses:
+        if h.present_fit_score and h.present_fit_score.score >= 70:
+            strong_matches += 1
+        if h.potential_score and h.potential_score.score >= 80:
+            high_potential += 1
+        if h.price:
+            if price_min is None or h.price < price_min:
+                price_min = h.price
+            if price_max is None or h.price > price_max:
+                price_max = h.price
+    price_range = "N/A"
+    if price_min is not None:
+        price_range = f"${price_min / 1000:.0f}k - ${price_max / 1000:.0f}k"
+
+    generated_at = datetime.now().strftime("%B %d, %Y at %I:%M %p")
+
+    map_section = ""
+    if houses_with_coords:
+        map_section = _MAP_SECTION_HTML.format(count=len(houses_with_coords))
+
+    summary_html = _SUMMARY_HTML.format(
+        house_count=len(houses),
+        strong_matches=strong_matches,
+        price_range=price_range,
+        high_potential=high_potential,
+    )
+
+    write(_HEAD_HTML)
+    write(f"""<body>
+    <div class="container">
+        <header>
+            <h1>House Evaluation Report</h1>
+            <p class="subtitle">Generated {generated_at}</p>
+        </header>
+
+        {summary_html}
+
+        {map_section}
+
+        <div class="houses">
+""")
+
+    for house in houses:
+        # Each nested result is looked up once per card
+        fit = house.present_fit_score
+        potential = house.potential_score
+        vision = house.vision_analysis
+        fit_score = fit.score if fit else 0
+        pot_score = potential.score if potential else 0
+
+        # Determine score color class
+        fit_class = SCORE_CLASSES[score_level(fit_score, FIT_CUTOFFS)]
+        pot_class = SCORE_CLASSES[score_level(pot_score, POTENTIAL_CUTOFFS)]
+
+        # Get first image or placeholder
+        image_url = house.image_urls[0] if house.image_urls else ""
+
+        # Features text
+        features = []
+        if house.bedrooms:
+            features.append(f"{house.bedrooms} bed")
+        if house.bathrooms:
+            features.append(f"{house.bathrooms:.0f} bath")
+        if house.sqft:
+            features.append(f"{house.sqft:,} sqft")
+        features_text = " · ".join(features)
+
+        price_text = f"${house.price:,}" if house.price else "N/A"
+
+        # Justification
+        justification = fit.justification if fit else ""
+
+        # Tags from vision analysis
+        tags_html = ""
+        if vision:
+            tags_html = "".join(
+                [f'<span class="tag tag-positive">✓ {tag}</span>' for tag in vision.positive_signals[:3]]
+                + [f'<span class="tag tag-negative">✗ {tag}</span>' for tag in vision.red_flags[:3]]
+            )
+
+        # Renovation ideas
+        renovation_html = ""
+        if potential and potential.renovation_ideas:
+            ideas_html = "".join(
+                f'''
+                <div class="renovation-idea">
+                    <div class="renovation-area">{idea.area}</div>
+                    <div class="renovation-change">{idea.proposed_change}</div>
+                </div>'''
+                for idea in potential.renovation_ideas[:2]
+            )
+            renovation_html = f'<div class="renovation-ideas">{ideas_html}</div>'
+
+        write(f"""
+            <div class="house-card">
+                <img src="{image_url}" alt="{house.address}" class="house-image" onerror="this.style.display='none'">
+                <div class="house-content">
+                    <div class="house-header">
+                        <div>
+                            <div class="house-address">{house.address}</div>
+                            <div class="house-price">{price_text}</div>
+                            <div class="house-features">{features_text}</div>
+                        </div>
+                        <div class="scores">
+                            <div class="score-badge">
+                                <div class="score-value {fit_class}">{fit_score:.0f}</div>
+                                <div class="score-label">Fit Score</div>
+                            </div>
+                            <div class="score-badge">
+                                <div class="score-value {pot_class}">{pot_score:.0f}</div>
+                                <div class="score-label">Potential</div>
+                            </div>
+                        </div>
+                    </div>
+
+                    <div class="justification">{justification}</div>
+
+                    <div class="tags">
+                        {tags_html}
+                    </div>
+
+                    {renovation_html}
+
+                    <a href="{house.url}" target="_blank" class="house-link">View on Zillow →</a>
+
+                    <div class="brief-section">
+                        <button class="brief-toggle" onclick="toggleBrief(this)">
+                            Show Full Brief
+                        </button>
+                        <div class="brief-content" data-markdown="{html_escape_for_attr(house.brief)}">
+                            {'' if house.brief else 'No brief generated'}
+                        </div>
+                    </div>
+                </div>
+            </div>
+""")
+
+    write(_FOOTER_HTML)
+
+    # Add map initialization script if we have geocoded houses
+    if houses_with_coords:
+        # Generate markers data, summing coordinates for the map center on the way
+        markers = []
+        lat_total = lng_total = 0.0
+        for h in houses_with_coords:
+            lat_total += h.latitude
+            lng_total += h.longitude
+            fit_score = h.present_fit_score.score if h.present_fit_score else 0
+            pot_score = h.potential_score.score if h.potential_score else 0
+
+            # Color based on fit and potential scores
+            fit_color = MARKER_COLORS[score_level(fit_score, FIT_CUTOFFS)]
+            pot_color = MARKER_COLORS[score_level(pot_score, POTENTIAL_CUTOFFS)]
+
+            # One row per house, in the order unpacked by the script below
+            markers.append((
+                h.latitude,
+                h.longitude,
+                h.address,
+                f"${h.price:,}" if h.price else "N/A",
+                round(fit_score),
+                round(pot_score),
+                fit_color,
+                pot_color,
+                h.url,
+                h.image_urls[0] if h.image_urls else "",
+            ))
+
+        # Calculate map center (average of all coordinates)
+        avg_lat = lat_total / len(houses_with_coords)
+        avg_lng = lng_total / len(houses_with_coords)
+
+        markers_data = script_json(markers)
+
+        write(f"""
+    <script>
+        // Initialize Leaflet map
+        const map = L.map('map').setView([{avg_lat}, {avg_lng}], 11);
+        window.map = map;
+
+        // Add OpenStreetMap tiles
+        L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
+            attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
+        }}).addTo(map);
+
+        // House markers data, sent as rows to keep the keys out of the page
+        const houses = {markers_data}.map(
+            ([lat, lng, address, price, fit, potential, fitColor, potColor, url, thumbnail]) =>
+                ({{ lat, lng, address, price, fit, potential, fitColor, potColor, url, thumbnail }})
+        );
+""")
+        write(_MAP_SCRIPT_JS)
+
+    write("""
 </body>
 </html>
-"""
+""")
 
-    return html
 
+def save_report(output_path: str = "report.html", compress: bool = False) -> str:
+    """Generate and save the HTML report.
 
-def save_report(output_path: str = "report.html") -> str:
-    """Generate and save the HTML report."""
-    html = generate_report()
+    With ``compress``, the report is gzipped to ``<output_path>.gz`` instead,
+    ready to upload or serve with Content-Encoding: gzip.
+    """
     path = Path(output_path)
-    path.write_text(html)
+    if compress:
+        path = path.with_name(f"{path.name}.gz")
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+            stream_report(f.write)
+        return str(path.absolute())
+
+    # Write sections as they're generated; the large buffer batches them into few syscalls
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        stream_report(f.write)
     return str(path.absolute())
 
 
@@ -1,64 +1,161 @@
 """Geocoding service using Nominatim (OpenStreetMap)."""
 
+import os
+import threading
 import time
-import urllib.parse
-import urllib.request
-import json
-from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cache
+from pathlib import Path
+from typing import Callable, Tuple
 
+import httpx
+import orjson
 
-# Rate limit: 1 request per second for Nominatim
+
+NOMINATIM_SEARCH_URL = "https://nominatim.openstreetmap.org/search"
+
+# Rate limit: 1 request per second for Nominatim, shared by all threads
 _last_request_time = 0
+_rate_lock = threading.Lock()
+
+# Lookups persist across runs, so re-running a report or import doesn't
+# re-query (and wait a second for) addresses already resolved. This is the
+# default store's file; callers with a store pass its geocode_cache_file.
+GEOCODE_CACHE_PATH = Path("data") / "cache" / "geocode.json"
+
+# Addresses Nominatim couldn't find are retried after a week
+MISS_TTL_SECONDS = 7 * 24 * 3600
+
+# Cache file path -> its contents, each read on first use
+_caches: dict[Path, dict] = {}
+_cache_lock = threading.Lock()
+
+# Lookups in flight at once in batch_geocode. Requests still go out one per
+# second; the workers overlap each response with the wait for the next slot.
+BATCH_WORKERS = 4
+
 
+def _cache_key(address: str) -> str:
+    """Case- and whitespace-insensitive key for an address."""
+    return " ".join(address.lower().split())
+
+
+def _load_cache(cache_path: Path) -> dict:
+    """The on-disk cache, read on first use: {"hits": {key: [lat, lon]}, "misses": {key: time}}."""
+    with _cache_lock:
+        cache = _caches.get(cache_path)
+        if cache is None:
+            try:
+                cache = orjson.loads(cache_path.read_bytes())
+            except (FileNotFoundError, orjson.JSONDecodeError):
+                cache = {"hits": {}, "misses": {}}
+            _caches[cache_path] = cache
+        return cache
+
+
+def _record(cache_path: Path, section: str, key: str, value) -> None:
+    """Store a hit or miss and write the cache through a temp file."""
+    with _cache_lock:
+        cache = _caches[cache_path]
+        cache[section][key] = value
+        cache["misses" if section == "hits" else "hits"].pop(key, None)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.tmp")
+        tmp_path.write_bytes(orjson.dumps(cache))
+        os.replace(tmp_path, cache_path)
+
+
+@cache
+def _http_client() -> httpx.Client:
+    """One pooled client for every lookup, so requests reuse the TLS connection."""
+    return httpx.Client(
+        # Proper User-Agent is required by Nominatim
+        headers={"User-Agent": "HouseEvaluator/1.0 (home listing evaluator)"},
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=BATCH_WORKERS, max_keepalive_connections=BATCH_WORKERS),
+    )
 
-def geocode_address(address: str) -> Tuple[float, float] | None:
+
+def _wait_for_rate_limit() -> None:
+    """Block until this thread may send the next Nominatim request."""
+    global _last_request_time
+    with _rate_lock:
+        elapsed = time.time() - _last_request_time
+        if elapsed < 1.0:
+            time.sleep(1.0 - elapsed)
+        _last_request_time = time.time()
+
+
+def geocode_address(
+    address: str,
+    cache_path: Path = GEOCODE_CACHE_PATH,
+) -> Tuple[float, float] | None:
     """
     Convert an address to latitude/longitude coordinates using Nominatim.
 
+    Args:
+        address: Address to look up
+        cache_path: Lookup cache file, normally the store's geocode_cache_file
+
     Returns:
         Tuple of (latitude, longitude) or None if not found.
     """
-    global _last_request_time
-
-    # Rate limiting - wait at least 1 second between requests
-    elapsed = time.time() - _last_request_time
-    if elapsed < 1.0:
-        time.sleep(1.0 - elapsed)
-
-    # Build the request URL
-    encoded_address = urllib.parse.quote(address)
-    url = f"https://nominatim.openstreetmap.org/search?q={encoded_address}&format=json&limit=1"
-
-    # Make request with proper User-Agent (required by Nominatim)
-    request = urllib.request.Request(
-        url,
-        headers={"User-Agent": "HouseEvaluator/1.0 (home listing evaluator)"}
-    )
+    cache = _load_cache(cache_path)
+    key = _cache_key(address)
+    hit = cache["hits"].get(key)
+    if hit is not None:
+        return (hit[0], hit[1])
+    missed_at = cache["misses"].get(key)
+    if missed_at is not None and time.time() - missed_at < MISS_TTL_SECONDS:
+        return None
 
     try:
-        _last_request_time = time.time()
-        with urllib.request.urlopen(request, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            if data and len(data) > 0:
-                lat = float(data[0]["lat"])
-                lon = float(data[0]["lon"])
-                return (lat, lon)
+        # Rate limiting - wait at least 1 second between requests
+        _wait_for_rate_limit()
+        response = _http_client().get(
+            NOMINATIM_SEARCH_URL,
+            params={"q": address, "format": "json", "limit": 1},
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        if data and len(data) > 0:
+            lat = float(data[0]["lat"])
+            lon = float(data[0]["lon"])
+            _record(cache_path, "hits", key, [lat, lon])
+            return (lat, lon)
+        # Not found; network errors below aren't cached, so they retry
+        _record(cache_path, "misses", key, time.time())
     except Exception as e:
         print(f"Geocoding error for '{address}': {e}")
 
     return None
 
 
-def batch_geocode(addresses: list[str]) -> dict[str, Tuple[float, float]]:
+def batch_geocode(
+    addresses: list[str],
+    on_result: Callable[[str, Tuple[float, float] | None], None] | None = None,
+    cache_path: Path = GEOCODE_CACHE_PATH,
+) -> dict[str, Tuple[float, float]]:
     """
-    Geocode multiple addresses.
+    Geocode multiple addresses on a small thread pool.
+
+    Args:
+        addresses: Addresses to look up; each distinct one is looked up once
+        on_result: Called with each address and its coordinates (or None)
+            as lookups finish, from the calling thread
+        cache_path: Lookup cache file, normally the store's geocode_cache_file
 
     Returns:
         Dictionary mapping address to (lat, lon) tuple.
     """
     results = {}
-    for address in addresses:
-        coords = geocode_address(address)
-        if coords:
-            results[address] = coords
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+        futures = {pool.submit(geocode_address, address, cache_path): address for address in dict.fromkeys(addresses)}
+        for future in as_completed(futures):
+            address = futures[future]
+            coords = future.result()
+            if coords:
+                results[address] = coords
+            if on_result:
+                on_result(address, coords)
     return results
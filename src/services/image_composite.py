@@ -1,38 +1,323 @@
 """Image composite service for creating grid images from listing photos."""
 
 import asyncio
+import hashlib
 import math
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
 from io import BytesIO
+from itertools import repeat
+from pathlib import Path
 
 import httpx
 from PIL import Image
 
+from src.services.openrouter import close_with_loop
 
-async def fetch_image(client: httpx.AsyncClient, url: str) -> Image.Image | None:
-    """Fetch a single image from URL."""
+try:
+    import pyvips
+except (ImportError, OSError):  # optional; OSError when libvips itself is missing
+    pyvips = None
+
+# Composites are photo grids sent straight to the vision API, so JPEG is both
+# faster to encode and several times smaller than PNG; PNG stays available for
+# sharp-edged images such as screenshots
+COMPOSITE_FORMAT = "JPEG"
+JPEG_QUALITY = 85
+
+# When PNG is used, a fast zlib level beats a small file; optimize=True
+# (level 9 plus a filter search) dominated the encode
+PNG_COMPRESS_LEVEL = 1
+
+# Listing photos come from one or two CDN hosts; one pooled HTTP/2 client per
+# event loop lets every composite reuse the same handshakes
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+# Listing photos larger than this are skipped rather than buffered and decoded
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Per-photo thumbnails kept on disk; the least recently used are swept past this
+THUMB_CACHE_MAX_FILES = 5000
+
+# Sources more than this many times the cell size are first box-reduced by an
+# integer factor, which is much cheaper than resampling the full image
+REDUCING_GAP = 2.0
+
+# Grid canvases kept per size for reuse, so batch runs don't allocate (and
+# page-fault in) several megabytes per composite
+CANVAS_POOL_SIZE = 4
+
+_canvas_pool: dict[tuple[int, int], list[Image.Image]] = {}
+_canvas_lock = threading.Lock()
+
+# Decoded photos remembered in-process by URL and by content hash, so photos
+# shared between listings are fetched and decoded once per run. Each photo
+# takes two entries; JPEGs are held drafted to about twice the cell size.
+DECODED_MEMO_SIZE = 128
+
+_decoded_memo: OrderedDict[tuple, Image.Image] = OrderedDict()
+_memo_lock = threading.Lock()
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+_client_closer: AsyncIterator[None] | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Lazy-load the image client bound to the running event loop.
+
+    Like OpenRouterClient.async_client, each client is closed when its loop
+    shuts down, even if aclose_client() is never called.
+    """
+    global _client, _client_loop, _client_closer
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(timeout=30.0, http2=True, limits=HTTP_LIMITS)
+        _client_loop = loop
+        _client_closer = close_with_loop(_client, loop)
+    return _client
+
+
+async def aclose_client() -> None:
+    """Close the shared image client, if one was opened on this loop."""
+    global _client, _client_loop, _client_closer
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _client_loop = None
+        _client_closer = None
+
+
+async def fetch_image(
+    client: httpx.AsyncClient,
+    url: str,
+    draft_size: tuple[int, int] | None = None,
+) -> Image.Image | None:
+    """Fetch a single image from URL.
+
+    With draft_size, JPEGs are decoded at reduced scale down to about that
+    size (see decode_image). Bodies over MAX_IMAGE_BYTES are abandoned
+    mid-download.
+    """
+    data = await _download(client, url)
+    if data is None:
+        return None
+    return await asyncio.to_thread(decode_image, data, draft_size)
+
+
+async def _download(client: httpx.AsyncClient, url: str) -> bytes | None:
+    """Download an image body, or None if it fails or exceeds MAX_IMAGE_BYTES."""
     try:
-        response = await client.get(url, follow_redirects=True)
-        response.raise_for_status()
-        return Image.open(BytesIO(response.content))
+        async with client.stream("GET", url, follow_redirects=True) as response:
+            response.raise_for_status()
+            if int(response.headers.get("content-length", 0)) > MAX_IMAGE_BYTES:
+                return None
+            buf = bytearray()
+            async for chunk in response.aiter_bytes(STREAM_CHUNK_BYTES):
+                buf += chunk
+                if len(buf) > MAX_IMAGE_BYTES:
+                    return None
+        return bytes(buf)
     except Exception:
         return None
 
 
-async def fetch_images(urls: list[str], max_concurrent: int = 10) -> list[Image.Image]:
-    """Fetch multiple images concurrently."""
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        semaphore = asyncio.Semaphore(max_concurrent)
+def decode_image(data: bytes, draft_size: tuple[int, int] | None = None) -> Image.Image | None:
+    """Decode image bytes, or None if the data is corrupt.
+
+    With draft_size, JPEGs are decoded at the smallest 1/2, 1/4 or 1/8 scale
+    that still covers that size, so listing photos several thousand pixels
+    wide never get decoded at full resolution. libvips does this (plus the
+    shrink to draft_size) when pyvips is installed; Pillow's draft() otherwise.
+    """
+    try:
+        if draft_size is not None and pyvips is not None and data.startswith(b"\xff\xd8"):
+            return _vips_decode(data, draft_size)
+        img = Image.open(BytesIO(data))
+        if draft_size is not None and img.format == "JPEG":
+            img.draft("RGB", draft_size)
+        img.load()
+        return img
+    except Exception:
+        return None
+
 
-        async def fetch_with_semaphore(url: str) -> Image.Image | None:
-            async with semaphore:
-                return await fetch_image(client, url)
+def _vips_decode(data: bytes, size: tuple[int, int]) -> Image.Image:
+    """Shrink-on-load a JPEG with libvips to fit size and hand the pixels to Pillow."""
+    vimg = pyvips.Image.thumbnail_buffer(data, size[0], height=size[1], size="down")
+    if vimg.hasalpha():
+        vimg = vimg.flatten(background=[255, 255, 255])
+    vimg = vimg.colourspace("srgb").cast("uchar")
+    return Image.frombuffer(
+        "RGB", (vimg.width, vimg.height), vimg.write_to_memory(), "raw", "RGB", 0, 1
+    )
 
-        tasks = [fetch_with_semaphore(url) for url in urls]
-        results = await asyncio.gather(*tasks)
 
+async def fetch_images(
+    urls: list[str],
+    max_concurrent: int = 16,
+    draft_size: tuple[int, int] | None = None,
+) -> list[Image.Image]:
+    """Fetch multiple images concurrently."""
+    results = await _fetch_all(urls, max_concurrent, draft_size)
     return [img for img in results if img is not None]
 
 
+async def _fetch_all(
+    urls: list[str],
+    max_concurrent: int,
+    draft_size: tuple[int, int] | None,
+) -> list[Image.Image | None]:
+    """Fetch multiple images concurrently, with None in place of each failure."""
+    client = _get_client()
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def fetch_with_semaphore(url: str) -> Image.Image | None:
+        url_key = (url, draft_size)
+        img = _memo_get(url_key)
+        if img is not None:
+            return img
+
+        async with semaphore:
+            data = await _download(client, url)
+        if data is None:
+            return None
+
+        # The same photo is often syndicated under several URLs; decode it once
+        content_key = (hashlib.blake2b(data, digest_size=16).digest(), draft_size)
+        img = _memo_get(content_key)
+        if img is None:
+            # Decode each photo in a thread as soon as it arrives, overlapping the
+            # other downloads, and after freeing its slot for the next one
+            img = await asyncio.to_thread(decode_image, data, draft_size)
+            if img is None:
+                return None
+        _memo_put(url_key, img)
+        _memo_put(content_key, img)
+        return img
+
+    tasks = [fetch_with_semaphore(url) for url in urls]
+    return await asyncio.gather(*tasks)
+
+
+def _memo_get(key: tuple) -> Image.Image | None:
+    """A decoded photo remembered under a URL or content key, marking it recently used."""
+    with _memo_lock:
+        img = _decoded_memo.get(key)
+        if img is not None:
+            _decoded_memo.move_to_end(key)
+        return img
+
+
+def _memo_put(key: tuple, img: Image.Image) -> None:
+    """Remember a decoded photo, evicting the least recently used past the limit."""
+    with _memo_lock:
+        _decoded_memo[key] = img
+        _decoded_memo.move_to_end(key)
+        while len(_decoded_memo) > DECODED_MEMO_SIZE:
+            _decoded_memo.popitem(last=False)
+
+
+async def fetch_cells(
+    urls: list[str],
+    cell_width: int,
+    cell_height: int,
+    cache_dir: Path,
+) -> list[Image.Image]:
+    """Fetch images already resized to fit a cell, reusing thumbnails cached on disk.
+
+    Only photos without a cached thumbnail are downloaded, decoded and
+    resampled; the new thumbnails are written back for later composites.
+    """
+    _prune_thumb_cache(cache_dir)
+    paths = [thumb_cache_path(cache_dir, url, cell_width, cell_height) for url in urls]
+    cached: dict[int, Image.Image] = await asyncio.to_thread(_load_thumbnails, paths)
+    missing = [i for i in range(len(paths)) if i not in cached]
+
+    fetched = await _fetch_all(
+        [urls[i] for i in missing],
+        max_concurrent=16,
+        draft_size=(cell_width * 2, cell_height * 2),
+    )
+    cells: dict[int, Image.Image] = await asyncio.to_thread(
+        _store_thumbnails, missing, fetched, paths, cell_width, cell_height
+    )
+    cells.update(cached)
+    return [cells[i] for i in range(len(paths)) if i in cells]
+
+
+def _load_thumbnails(paths: list[Path]) -> dict[int, Image.Image]:
+    """Decode the cached thumbnails that exist; unreadable ones count as misses."""
+    result = {}
+    for i, path in enumerate(paths):
+        if not path.exists():
+            continue
+        try:
+            img = Image.open(path)
+            img.load()
+            # Refresh the mtime so the pruning sweep keeps recently used thumbnails
+            os.utime(path)
+        except OSError:
+            # Truncated or corrupt file (or pruned meanwhile): fetch the photo again
+            continue
+        result[i] = img
+    return result
+
+
+def thumb_cache_path(cache_dir: Path, url: str, cell_width: int, cell_height: int) -> Path:
+    """Path of the cached thumbnail of one photo at one cell size."""
+    key = hashlib.sha256(f"{url}|{cell_width}x{cell_height}".encode("utf-8")).hexdigest()
+    return cache_dir / f"{key[:32]}.jpg"
+
+
+def _store_thumbnails(
+    indexes: list[int],
+    images: list[Image.Image | None],
+    paths: list[Path],
+    cell_width: int,
+    cell_height: int,
+) -> dict[int, Image.Image]:
+    """Resize freshly fetched photos into cells and cache each one as JPEG."""
+    fetched = [(i, img) for i, img in zip(indexes, images) if img is not None]
+    cells = _resize_pool().map(
+        _resize_for_cell,
+        [img for _, img in fetched],
+        repeat(cell_width),
+        repeat(cell_height),
+    )
+
+    result = {}
+    for (i, _), cell in zip(fetched, cells):
+        paths[i].parent.mkdir(parents=True, exist_ok=True)
+        buffer = BytesIO()
+        cell.save(buffer, format="JPEG", quality=JPEG_QUALITY)
+        # Write a sibling temp file and swap it in, so readers never see a torn thumbnail
+        tmp_path = paths[i].with_name(f"{paths[i].name}.tmp")
+        tmp_path.write_bytes(buffer.getvalue())
+        os.replace(tmp_path, paths[i])
+        result[i] = cell
+    return result
+
+
+@cache
+def _prune_thumb_cache(cache_dir: Path) -> None:
+    """Trim the thumbnail cache to its newest files, once per process and directory."""
+    try:
+        entries = [e for e in os.scandir(cache_dir) if e.name.endswith(".jpg")]
+    except FileNotFoundError:
+        return
+    if len(entries) <= THUMB_CACHE_MAX_FILES:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[THUMB_CACHE_MAX_FILES:]:
+        Path(entry.path).unlink(missing_ok=True)
+
+
 def calculate_grid_dimensions(num_images: int, max_cols: int = 5) -> tuple[int, int]:
     """Calculate optimal grid dimensions for n images.
 
@@ -55,6 +340,63 @@ def calculate_grid_dimensions(num_images: int, max_cols: int = 5) -> tuple[int,
     return (cols, rows)
 
 
+def _acquire_canvas(size: tuple[int, int], bg_color: tuple[int, int, int]) -> Image.Image:
+    """An RGB canvas of this size filled with bg_color, from the pool if one is free."""
+    with _canvas_lock:
+        free = _canvas_pool.get(size)
+        canvas = free.pop() if free else None
+    if canvas is None:
+        return Image.new("RGB", size, bg_color)
+    canvas.paste(bg_color, (0, 0, *size))
+    return canvas
+
+
+def _release_canvas(canvas: Image.Image) -> None:
+    """Return a canvas to the pool once nothing references it any more."""
+    with _canvas_lock:
+        free = _canvas_pool.setdefault(canvas.size, [])
+        if len(free) < CANVAS_POOL_SIZE:
+            free.append(canvas)
+
+
+@cache
+def _resize_pool() -> ThreadPoolExecutor:
+    """Threads shared by every composite for resizing images into cells."""
+    return ThreadPoolExecutor(max_workers=os.cpu_count())
+
+
+def _resize_for_cell(img: Image.Image, cell_width: int, cell_height: int) -> Image.Image:
+    """Resize an image to fit a cell while maintaining aspect ratio, as RGB."""
+    img_ratio = img.width / img.height
+    cell_ratio = cell_width / cell_height
+
+    if img_ratio > cell_ratio:
+        # Image is wider, fit to width
+        new_width = cell_width
+        new_height = int(cell_width / img_ratio)
+    else:
+        # Image is taller, fit to height
+        new_height = cell_height
+        new_width = int(cell_height * img_ratio)
+
+    if (new_width, new_height) == img.size and img.mode == "RGB":
+        # Already a cell-sized thumbnail, e.g. one loaded from the cache
+        return img
+
+    # Drafted JPEGs are already within 2x of the cell, where BICUBIC is
+    # indistinguishable from LANCZOS and cheaper. reducing_gap lets larger
+    # sources box-reduce by an integer factor first. Not thumbnail(): it works
+    # in place, and fetched images are shared between composites.
+    resized = img.resize(
+        (new_width, new_height), Image.Resampling.BICUBIC, reducing_gap=REDUCING_GAP
+    )
+
+    # Convert to RGB if necessary
+    if resized.mode != "RGB":
+        resized = resized.convert("RGB")
+    return resized
+
+
 def create_grid_image(
     images: list[Image.Image],
     cell_width: int = 400,
@@ -72,38 +414,25 @@ def create_grid_image(
     total_width = cols * cell_width + (cols + 1) * padding
     total_height = rows * cell_height + (rows + 1) * padding
 
-    # Create canvas
-    canvas = Image.new("RGB", (total_width, total_height), bg_color)
+    # Create canvas, reusing one released by an earlier composite of this size
+    canvas = _acquire_canvas((total_width, total_height), bg_color)
 
-    for idx, img in enumerate(images):
-        if idx >= cols * rows:
-            break
+    # Decoding and resampling run in Pillow's C code, which releases the GIL,
+    # so the cells are prepared in parallel and pasted in order
+    cells = _resize_pool().map(
+        _resize_for_cell,
+        images[: cols * rows],
+        repeat(cell_width),
+        repeat(cell_height),
+    )
 
+    for idx, resized in enumerate(cells):
         row = idx // cols
         col = idx % cols
 
-        # Resize image to fit cell while maintaining aspect ratio
-        img_ratio = img.width / img.height
-        cell_ratio = cell_width / cell_height
-
-        if img_ratio > cell_ratio:
-            # Image is wider, fit to width
-            new_width = cell_width
-            new_height = int(cell_width / img_ratio)
-        else:
-            # Image is taller, fit to height
-            new_height = cell_height
-            new_width = int(cell_height * img_ratio)
-
-        resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-        # Convert to RGB if necessary
-        if resized.mode != "RGB":
-            resized = resized.convert("RGB")
-
         # Calculate position (centered in cell)
-        x = padding + col * (cell_width + padding) + (cell_width - new_width) // 2
-        y = padding + row * (cell_height + padding) + (cell_height - new_height) // 2
+        x = padding + col * (cell_width + padding) + (cell_width - resized.width) // 2
+        y = padding + row * (cell_height + padding) + (cell_height - resized.height) // 2
 
         canvas.paste(resized, (x, y))
 
@@ -115,6 +444,10 @@ async def create_composite(
     cell_width: int = 400,
     cell_height: int = 300,
     max_images: int | None = None,
+    cache_dir: Path | None = None,
+    png_compress_level: int = PNG_COMPRESS_LEVEL,
+    image_format: str = COMPOSITE_FORMAT,
+    thumb_cache_dir: Path | None = None,
 ) -> bytes:
     """Create a composite grid image from URLs.
 
@@ -123,29 +456,78 @@ async def create_composite(
         cell_width: Width of each cell in pixels
         cell_height: Height of each cell in pixels
         max_images: Maximum number of images to include (None = no limit)
+        cache_dir: Directory to reuse composites of the same URLs from (None = no cache)
+        png_compress_level: zlib level for the PNG encode (0-9)
+        image_format: "JPEG" or "PNG"
+        thumb_cache_dir: Directory to reuse per-photo cell thumbnails from (None = no cache)
 
     Returns:
-        PNG image bytes
+        Encoded image bytes
     """
     # Limit number of images if specified
     urls = image_urls[:max_images] if max_images else image_urls
 
-    # Fetch images
-    images = await fetch_images(urls)
-
+    cache_path = None
+    if cache_dir is not None:
+        key = composite_cache_key(urls, cell_width, cell_height, image_format)
+        cache_path = cache_dir / f"{key}.{image_format.lower()}"
+        if cache_path.exists():
+            return cache_path.read_bytes()
+
+    if thumb_cache_dir is not None:
+        images = await fetch_cells(urls, cell_width, cell_height, thumb_cache_dir)
+    else:
+        # Fetch images, letting JPEGs decode at reduced scale down to twice the cell
+        images = await fetch_images(urls, draft_size=(cell_width * 2, cell_height * 2))
+
+    # Decoding, resizing and encoding are CPU-bound; run them off the event
+    # loop so other houses in a batch keep downloading and calling the API
+    composite = await asyncio.to_thread(
+        encode_composite, images, cell_width, cell_height, png_compress_level, image_format
+    )
+
+    # A placeholder means every download failed; don't pin that in the cache
+    if cache_path is not None and images:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Swap a finished temp file in, so a torn composite never becomes a cache hit
+        tmp_path = cache_path.with_name(f"{cache_path.name}.tmp")
+        tmp_path.write_bytes(composite)
+        os.replace(tmp_path, cache_path)
+    return composite
+
+
+def composite_cache_key(
+    urls: list[str], cell_width: int, cell_height: int, image_format: str = COMPOSITE_FORMAT
+) -> str:
+    """Key a composite on its image URLs, cell size and encoding."""
+    payload = "\n".join([f"{cell_width}x{cell_height}", image_format.upper(), *sorted(urls)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def encode_composite(
+    images: list[Image.Image],
+    cell_width: int = 400,
+    cell_height: int = 300,
+    png_compress_level: int = PNG_COMPRESS_LEVEL,
+    image_format: str = COMPOSITE_FORMAT,
+) -> bytes:
+    """Build the grid from fetched images and encode it as JPEG or PNG bytes."""
     if not images:
         # Create placeholder if no images fetched
-        placeholder = Image.new("RGB", (cell_width, cell_height), (200, 200, 200))
-        buffer = BytesIO()
-        placeholder.save(buffer, format="PNG")
-        return buffer.getvalue()
-
-    # Create grid
-    grid = create_grid_image(images, cell_width, cell_height)
+        grid = Image.new("RGB", (cell_width, cell_height), (200, 200, 200))
+    else:
+        grid = create_grid_image(images, cell_width, cell_height)
 
     # Convert to bytes
     buffer = BytesIO()
-    grid.save(buffer, format="PNG", optimize=True)
+    if image_format.upper() == "PNG":
+        grid.save(buffer, format="PNG", compress_level=png_compress_level)
+    else:
+        grid.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=False, progressive=False)
+
+    # Only the encoded bytes leave this function, so the canvas can be reused
+    if images:
+        _release_canvas(grid)
     return buffer.getvalue()
 
 
@@ -154,6 +536,27 @@ def create_composite_sync(
     cell_width: int = 400,
     cell_height: int = 300,
     max_images: int | None = None,
+    cache_dir: Path | None = None,
+    png_compress_level: int = PNG_COMPRESS_LEVEL,
+    image_format: str = COMPOSITE_FORMAT,
+    thumb_cache_dir: Path | None = None,
 ) -> bytes:
     """Synchronous wrapper for create_composite."""
-    return asyncio.run(create_composite(image_urls, cell_width, cell_height, max_images))
+
+    async def run() -> bytes:
+        # The loop ends with this call, so close the client opened on it
+        try:
+            return await create_composite(
+                image_urls,
+                cell_width,
+                cell_height,
+                max_images,
+                cache_dir,
+                png_compress_level,
+                image_format,
+                thumb_cache_dir,
+            )
+        finally:
+            await aclose_client()
+
+    return asyncio.run(run())
@@ -1,10 +1,90 @@
 """OpenRouter API client for vision and text models."""
 
+import asyncio
+import atexit
 import base64
+import json
 import os
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
+from functools import lru_cache
 
 import httpx
+import orjson
+
+
+# Shared connection pool; HTTP/2 multiplexes concurrent agent calls over one connection.
+# Idle connections are kept for 60s (httpx defaults to 5s) so calls spaced out by
+# interactive prompts or long generations don't pay a fresh TLS handshake.
+HTTP_LIMITS = httpx.Limits(
+    max_connections=64,
+    max_keepalive_connections=32,
+    keepalive_expiry=60.0,
+)
+
+# Generations can take minutes, but a connection that can't be opened in 10s
+# is retried rather than waited on; transport retries only cover failed
+# connects, so a request is never sent twice
+HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+CONNECT_RETRIES = 2
+
+# Stand-in for the image data URL in a vision request body. The base64 image
+# is spliced into the serialized bytes, so the multi-megabyte string is never
+# built as str, JSON-escaped, or encoded back to UTF-8.
+_IMAGE_URL_PLACEHOLDER = "__image_data_url__"
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _encode_body(payload: dict, image_bytes: bytes | None = None) -> bytes:
+    """Serialize a request body, splicing in the image as a data URL if given."""
+    body = orjson.dumps(payload)
+    if image_bytes is None:
+        return body
+    # Composites are JPEG by default; sniff the magic bytes so PNGs still work
+    mime = b"image/jpeg" if image_bytes.startswith(b"\xff\xd8") else b"image/png"
+    data_url = b"data:" + mime + b";base64," + base64.b64encode(image_bytes)
+    # The image follows the prompts in the body, so take the last occurrence
+    head, _, tail = body.rpartition(_IMAGE_URL_PLACEHOLDER.encode())
+    return b"".join((head, data_url, tail))
+
+
+# Retries for rate-limited async requests (concurrent batch scoring)
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 2.0
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying a rate-limited response."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return BACKOFF_BASE_SECONDS * (2 ** attempt)
+
+
+async def _close_on_loop_shutdown(client: httpx.AsyncClient) -> AsyncIterator[None]:
+    """Hold a loop-bound client open, closing it when its event loop shuts down.
+
+    asyncio.run() finalizes suspended async generators before it closes the
+    loop, the last point where the client's connections can still be closed
+    on the loop they belong to. Whoever starts this must keep a reference to
+    it, or it is finalized (closing the client) as soon as it's collected.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+def close_with_loop(
+    client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop
+) -> AsyncIterator[None]:
+    """Arrange for client to be closed when loop shuts down; keep the result referenced."""
+    closer = _close_on_loop_shutdown(client)
+    loop.create_task(anext(closer))
+    return closer
 
 
 @dataclass
@@ -30,82 +110,247 @@ class OpenRouterClient:
             config = OpenRouterConfig(api_key=api_key)
 
         self.config = config
+        self._headers = {
+            "Authorization": f"Bearer {config.api_key}",
+            "HTTP-Referer": config.site_url,
+            "X-Title": config.site_name,
+        }
         self._client = httpx.Client(
             base_url=config.base_url,
-            headers={
-                "Authorization": f"Bearer {config.api_key}",
-                "HTTP-Referer": config.site_url,
-                "X-Title": config.site_name,
-            },
-            timeout=120.0,
+            headers=self._headers,
+            timeout=HTTP_TIMEOUT,
+            transport=httpx.HTTPTransport(
+                http2=True, limits=HTTP_LIMITS, retries=CONNECT_RETRIES
+            ),
         )
+        self._async_client: httpx.AsyncClient | None = None
+        self._async_loop: asyncio.AbstractEventLoop | None = None
+        self._async_closer: AsyncIterator[None] | None = None
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Lazy-load async HTTP client bound to the running event loop.
+
+        Each client is closed when its loop shuts down, so a run that never
+        calls aclose() (or loops replaced run after run) leaves no pool open.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.config.base_url,
+                headers=self._headers,
+                timeout=HTTP_TIMEOUT,
+                transport=httpx.AsyncHTTPTransport(
+                    http2=True, limits=HTTP_LIMITS, retries=CONNECT_RETRIES
+                ),
+            )
+            self._async_loop = loop
+            self._async_closer = close_with_loop(self._async_client, loop)
+        return self._async_client
+
+    def _payload(
+        self,
+        messages: list[dict],
+        model: str,
+        temperature: float | None = None,
+        json_mode: bool = False,
+    ) -> dict:
+        """Build a chat completion request body."""
+        payload = {
+            "model": model,
+            "messages": messages,
+        }
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        return payload
 
-    def _make_request(self, messages: list[dict], model: str) -> str:
+    def _make_request(self, payload: dict, image_bytes: bytes | None = None) -> str:
         """Make a chat completion request."""
-        response = self._client.post(
-            "/chat/completions",
-            json={
-                "model": model,
-                "messages": messages,
-            },
-        )
+        content = _encode_body(payload, image_bytes)
+        response = self._client.post("/chat/completions", content=content, headers=_JSON_HEADERS)
         response.raise_for_status()
         data = response.json()
         return data["choices"][0]["message"]["content"]
 
-    def chat(
+    async def _amake_request(self, payload: dict, image_bytes: bytes | None = None) -> str:
+        """Make a chat completion request without blocking the event loop.
+
+        Rate-limited (429) responses are retried with exponential backoff,
+        honoring OpenRouter's Retry-After header when present.
+        """
+        content = _encode_body(payload, image_bytes)
+        for attempt in range(MAX_RETRIES + 1):
+            response = await self.async_client.post(
+                "/chat/completions", content=content, headers=_JSON_HEADERS
+            )
+            if response.status_code != 429 or attempt == MAX_RETRIES:
+                break
+            await asyncio.sleep(_retry_delay(response, attempt))
+        response.raise_for_status()
+        data = response.json()
+        return data["choices"][0]["message"]["content"]
+
+    def _system_message(self, system_prompt: str, cache_system: bool) -> dict:
+        """Build the system message, optionally marked for prompt caching.
+
+        The cache_control breakpoint lets providers that support it (Anthropic,
+        Gemini) reuse the prefill for a byte-identical system prompt.
+        """
+        if not cache_system:
+            return {"role": "system", "content": system_prompt}
+        return {
+            "role": "system",
+            "content": [
+                {
+                    "type": "text",
+                    "text": system_prompt,
+                    "cache_control": {"type": "ephemeral"},
+                },
+            ],
+        }
+
+    def _chat_messages(
         self,
         prompt: str,
-        system_prompt: str | None = None,
-        model: str | None = None,
-    ) -> str:
-        """Send a text chat request."""
-        model = model or self.config.default_text_model
+        system_prompt: str | None,
+        cache_system: bool = False,
+    ) -> list[dict]:
+        """Build messages for a text chat request."""
         messages = []
 
         if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
+            messages.append(self._system_message(system_prompt, cache_system))
 
         messages.append({"role": "user", "content": prompt})
 
-        return self._make_request(messages, model)
+        return messages
 
-    def vision(
+    def _vision_messages(
         self,
         prompt: str,
-        image_bytes: bytes,
-        system_prompt: str | None = None,
-        model: str | None = None,
-        image_detail: str = "high",
-    ) -> str:
-        """Send a vision request with an image."""
-        model = model or self.config.default_vision_model
+        system_prompt: str | None,
+        image_detail: str,
+        cache_system: bool = False,
+    ) -> list[dict]:
+        """Build messages for a vision request with an image.
+
+        The text prompt goes before the image so the per-house image is the
+        only part of the request that varies, keeping the prefix cacheable.
+        The image URL is a placeholder filled in by _encode_body.
+        """
         messages = []
 
         if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-
-        # Encode image to base64
-        image_b64 = base64.b64encode(image_bytes).decode("utf-8")
+            messages.append(self._system_message(system_prompt, cache_system))
 
         messages.append({
             "role": "user",
             "content": [
+                {
+                    "type": "text",
+                    "text": prompt,
+                },
                 {
                     "type": "image_url",
                     "image_url": {
-                        "url": f"data:image/png;base64,{image_b64}",
+                        "url": _IMAGE_URL_PLACEHOLDER,
                         "detail": image_detail,
                     },
                 },
-                {
-                    "type": "text",
-                    "text": prompt,
-                },
             ],
         })
 
-        return self._make_request(messages, model)
+        return messages
+
+    def chat(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        model: str | None = None,
+        cache_system: bool = False,
+        json_mode: bool = False,
+    ) -> str:
+        """Send a text chat request.
+
+        ``json_mode`` asks the model for a bare JSON object (no markdown fences).
+        """
+        model = model or self.config.default_text_model
+        messages = self._chat_messages(prompt, system_prompt, cache_system)
+        return self._make_request(self._payload(messages, model, json_mode=json_mode))
+
+    async def achat(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        cache_system: bool = False,
+        json_mode: bool = False,
+    ) -> str:
+        """Async variant of chat."""
+        model = model or self.config.default_text_model
+        messages = self._chat_messages(prompt, system_prompt, cache_system)
+        return await self._amake_request(self._payload(messages, model, temperature, json_mode))
+
+    async def astream_chat(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        model: str | None = None,
+        cache_system: bool = False,
+    ) -> AsyncIterator[str]:
+        """Stream a text chat response, yielding content deltas as they arrive."""
+        model = model or self.config.default_text_model
+        messages = self._chat_messages(prompt, system_prompt, cache_system)
+        payload = self._payload(messages, model)
+        payload["stream"] = True
+
+        async with self.async_client.stream("POST", "/chat/completions", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                # SSE: skip keep-alive comments and blank separators
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+    def vision(
+        self,
+        prompt: str,
+        image_bytes: bytes,
+        system_prompt: str | None = None,
+        model: str | None = None,
+        image_detail: str = "high",
+        cache_system: bool = False,
+        json_mode: bool = False,
+    ) -> str:
+        """Send a vision request with an image."""
+        model = model or self.config.default_vision_model
+        messages = self._vision_messages(prompt, system_prompt, image_detail, cache_system)
+        return self._make_request(self._payload(messages, model, json_mode=json_mode), image_bytes)
+
+    async def avision(
+        self,
+        prompt: str,
+        image_bytes: bytes,
+        system_prompt: str | None = None,
+        model: str | None = None,
+        image_detail: str = "high",
+        cache_system: bool = False,
+        json_mode: bool = False,
+    ) -> str:
+        """Async variant of vision."""
+        model = model or self.config.default_vision_model
+        messages = self._vision_messages(prompt, system_prompt, image_detail, cache_system)
+        payload = self._payload(messages, model, json_mode=json_mode)
+        return await self._amake_request(payload, image_bytes)
 
     def vision_with_json(
         self,
@@ -113,15 +358,24 @@ class OpenRouterClient:
         image_bytes: bytes,
         system_prompt: str | None = None,
         model: str | None = None,
+        cache_system: bool = False,
     ) -> str:
         """Vision request expecting JSON response."""
         full_prompt = f"{prompt}\n\nRespond with valid JSON only, no markdown."
-        return self.vision(full_prompt, image_bytes, system_prompt, model)
+        return self.vision(full_prompt, image_bytes, system_prompt, model, cache_system=cache_system)
 
     def close(self):
         """Close the HTTP client."""
         self._client.close()
 
+    async def aclose(self):
+        """Close the async HTTP client, if one was opened."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+            self._async_closer = None
+
     def __enter__(self):
         return self
 
@@ -129,6 +383,12 @@ class OpenRouterClient:
         self.close()
 
 
+@lru_cache()
 def get_openrouter_client() -> OpenRouterClient:
-    """Get a configured OpenRouter client."""
-    return OpenRouterClient()
+    """Get the process-wide OpenRouter client shared by all agents.
+
+    The sync connection pool is closed once at interpreter exit.
+    """
+    client = OpenRouterClient()
+    atexit.register(client.close)
+    return client
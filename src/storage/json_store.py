@@ -1,13 +1,63 @@
 """JSON file-based storage for houses and taste model."""
 
-import json
+import hashlib
+import os
+import re
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
+
+import orjson
 
 from src.models.house import House
 from src.models.taste import TasteModel
 
 
+# Street-type abbreviations expanded when comparing addresses
+_STREET_ABBRS = {
+    "st": "street",
+    "dr": "drive",
+    "ave": "avenue",
+    "rd": "road",
+    "ln": "lane",
+    "ct": "court",
+    "cir": "circle",
+    "blvd": "boulevard",
+    "pl": "place",
+}
+_NON_ALNUM_RE = re.compile(r"[\W_]+")
+# Characters dropped from house id slugs: all but letters, digits and spaces
+_SLUG_DROP_RE = re.compile(r"[^\w ]|_")
+# Only whole words preceded by a space, so a leading "St" (Saint) is kept
+_STREET_ABBR_RE = re.compile(rf"(?<= )(?:{'|'.join(_STREET_ABBRS)})(?= |$)")
+
+
+def _dump_json(data: dict) -> bytes:
+    """Serialize a model dump as indented JSON.
+
+    orjson writes datetimes as ISO 8601 itself, so dumps don't need
+    pydantic's JSON mode.
+    """
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+
+def _digest(blob: bytes) -> bytes:
+    """Short content hash of a serialized house, to detect unchanged saves."""
+    return hashlib.blake2b(blob, digest_size=16).digest()
+
+
+def _detached(house: House) -> House:
+    """A copy of a house that shares nothing mutable with the original.
+
+    Results are frozen and their collections are tuples, so a shallow copy
+    only needs its own lists.
+    """
+    return house.model_copy(update={
+        "image_urls": list(house.image_urls),
+        "annotations": list(house.annotations),
+    })
+
+
 class JsonStore:
     """JSON file storage for house evaluator data."""
 
@@ -16,60 +66,170 @@ class JsonStore:
         self.houses_dir = self.data_dir / "houses"
         self.taste_file = self.data_dir / "taste.json"
         self.aesthetics_file = self.data_dir / "aesthetics.md"
+        self.vision_cache_dir = self.data_dir / "cache" / "vision"
+        self.composite_cache_dir = self.data_dir / "cache" / "composites"
+        self.thumb_cache_dir = self.data_dir / "cache" / "thumbs"
+        self.score_index_file = self.data_dir / "cache" / "scores.json"
+        self.geocode_cache_file = self.data_dir / "cache" / "geocode.json"
 
         # Ensure directories exist
         self.houses_dir.mkdir(parents=True, exist_ok=True)
 
+        # Houses whose saves are held in memory until their deferral ends
+        self._deferred: set[str] = set()
+        self._pending: dict[str, House] = {}
+
+        # Parsed houses keyed by id, with the (mtime_ns, size) of the file they came from
+        self._house_cache: dict[str, tuple[tuple[int, int], House]] = {}
+
+        # Digest of each house file's bytes as last read or written, with its stamp
+        self._house_digests: dict[str, tuple[tuple[int, int], bytes]] = {}
+
+        # Normalized address -> house id, built on the first address lookup
+        self._address_index: dict[str, str] | None = None
+
+        # Ids handed out by generate_house_id, which may not be saved yet
+        self._issued_ids: set[str] = set()
+
+        # House id -> [mtime_ns, size, fit score or None], mirrored in score_index_file
+        self._score_index: dict[str, list] | None = None
+
     # House operations
 
     def save_house(self, house: House) -> Path:
-        """Save a house to JSON file."""
+        """Save a house to JSON file.
+
+        While the house's saves are deferred, the house is only kept in
+        memory and written when the deferral ends.
+        """
         file_path = self.houses_dir / f"{house.id}.json"
-        with open(file_path, "w") as f:
-            json.dump(house.model_dump(mode="json"), f, indent=2, default=str)
+        if house.id in self._deferred:
+            self._pending[house.id] = house
+            return file_path
+
+        blob = _dump_json(house.model_dump())
+        digest = _digest(blob)
+
+        # Re-saving an unchanged house (common when re-running scoring) skips the
+        # write, as long as the file is still the one this store last saw
+        known = self._house_digests.get(house.id)
+        if known is not None and known[1] == digest and file_path.exists():
+            stamp = self._file_stamp(file_path)
+            if stamp == known[0]:
+                self._house_cache[house.id] = (stamp, _detached(house))
+                return file_path
+
+        # Write a sibling temp file and swap it in, so readers never see a torn file
+        tmp_path = file_path.with_name(f"{file_path.name}.tmp")
+        tmp_path.write_bytes(blob)
+        os.replace(tmp_path, file_path)
+        stamp = self._file_stamp(file_path)
+        self._house_cache[house.id] = (stamp, _detached(house))
+        self._house_digests[house.id] = (stamp, digest)
+        if self._address_index is not None:
+            self._address_index[self.normalize_address(house.address)] = house.id
         return file_path
 
+    @contextmanager
+    def deferred_saves(self, house_id: str):
+        """Hold saves of one house in memory and write it once on exit.
+
+        Loads inside the block return the pending copy, so every step of a
+        pipeline sees the previous steps' results. The house is written even
+        if the block raises, keeping whatever steps completed.
+        """
+        self._deferred.add(house_id)
+        try:
+            yield
+        finally:
+            self._deferred.discard(house_id)
+            house = self._pending.pop(house_id, None)
+            if house is not None:
+                self.save_house(house)
+
     def load_house(self, house_id: str) -> House | None:
         """Load a house by ID."""
+        pending = self._pending.get(house_id)
+        if pending is not None:
+            return pending
         file_path = self.houses_dir / f"{house_id}.json"
         if not file_path.exists():
+            self._house_cache.pop(house_id, None)
             return None
-        with open(file_path) as f:
-            data = json.load(f)
-        return House.model_validate(data)
+        return self._read_house(file_path)
 
     def list_houses(self) -> list[House]:
         """List all houses."""
-        houses = []
-        for file_path in self.houses_dir.glob("*.json"):
-            with open(file_path) as f:
-                data = json.load(f)
-            houses.append(House.model_validate(data))
+        # scandir yields the names without a glob match per entry, and
+        # DirEntry.stat() gives the change stamp without reopening the path
+        with os.scandir(self.houses_dir) as entries:
+            houses = [
+                self._read_house(Path(entry.path), self._entry_stamp(entry))
+                for entry in entries
+                if entry.name.endswith(".json")
+            ]
         return sorted(houses, key=lambda h: h.ingested_at, reverse=True)
 
     def delete_house(self, house_id: str) -> bool:
         """Delete a house by ID."""
+        self._house_cache.pop(house_id, None)
+        self._house_digests.pop(house_id, None)
+        self._address_index = None
         file_path = self.houses_dir / f"{house_id}.json"
         if file_path.exists():
             file_path.unlink()
             return True
         return False
 
+    def _read_house(self, file_path: Path, stamp: tuple[int, int] | None = None) -> House:
+        """Parse a house file, reusing the parsed house while the file is unchanged.
+
+        Callers get their own copy, so results set on a loaded house that is
+        never saved (e.g. a pipeline that stops early) don't leak into later
+        loads as if they were on disk.
+        """
+        if stamp is None:
+            stamp = self._file_stamp(file_path)
+        cached = self._house_cache.get(file_path.stem)
+        if cached is not None and cached[0] == stamp:
+            return _detached(cached[1])
+
+        # House files are only written by save_house, so skip re-validating them
+        blob = file_path.read_bytes()
+        house = House.from_trusted(orjson.loads(blob))
+        self._house_cache[file_path.stem] = (stamp, house)
+        self._house_digests[file_path.stem] = (stamp, _digest(blob))
+        return _detached(house)
+
+    def house_digest(self, house_id: str) -> bytes | None:
+        """Digest of the house's file as this store last read or wrote it, if it has."""
+        known = self._house_digests.get(house_id)
+        return known[1] if known is not None else None
+
+    @staticmethod
+    def _file_stamp(file_path: Path) -> tuple[int, int]:
+        """Modification time and size, to detect a file changed on disk."""
+        stat = file_path.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _entry_stamp(entry: os.DirEntry) -> tuple[int, int]:
+        """Same as _file_stamp, for a directory entry from os.scandir."""
+        stat = entry.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+
     # Taste operations
 
     def save_taste(self, taste: TasteModel) -> Path:
         """Save the taste model."""
-        with open(self.taste_file, "w") as f:
-            json.dump(taste.model_dump(mode="json"), f, indent=2)
+        self.taste_file.write_bytes(_dump_json(taste.model_dump()))
         return self.taste_file
 
     def load_taste(self) -> TasteModel | None:
         """Load the taste model."""
         if not self.taste_file.exists():
             return None
-        with open(self.taste_file) as f:
-            data = json.load(f)
-        return TasteModel.model_validate(data)
+        return TasteModel.from_trusted(orjson.loads(self.taste_file.read_bytes()))
 
     def load_or_create_taste(self) -> TasteModel:
         """Load taste model or create empty one."""
@@ -98,70 +258,85 @@ class JsonStore:
         with open(self.aesthetics_file) as f:
             return f.read()
 
+    # Vision cache operations
+
+    def save_vision_cache(self, key: str, analysis: dict) -> Path:
+        """Save a parsed vision analysis under its cache key."""
+        self.vision_cache_dir.mkdir(parents=True, exist_ok=True)
+        file_path = self.vision_cache_dir / f"{key}.json"
+        tmp_path = file_path.with_name(f"{file_path.name}.tmp")
+        tmp_path.write_bytes(_dump_json(analysis))
+        os.replace(tmp_path, file_path)
+        return file_path
+
+    def load_vision_cache(self, key: str) -> dict | None:
+        """Load a cached vision analysis, or None on a miss or an unreadable entry."""
+        file_path = self.vision_cache_dir / f"{key}.json"
+        if not file_path.exists():
+            return None
+        try:
+            return orjson.loads(file_path.read_bytes())
+        except orjson.JSONDecodeError:
+            # A corrupt entry is just a miss; the next analysis overwrites it
+            return None
+
     # Utility methods
 
     def generate_house_id(self, address: str) -> str:
         """Generate a unique house ID from address."""
         # Simple slug from address
-        slug = address.lower()
-        slug = "".join(c if c.isalnum() or c == " " else "" for c in slug)
-        slug = "-".join(slug.split())[:50]
+        slug = _SLUG_DROP_RE.sub("", address.lower())
+        slug = "-".join(slug.split())[:50] or "house"
 
-        # Add timestamp suffix for uniqueness
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        return f"{slug}-{timestamp}" if slug else f"house-{timestamp}"
+        # Add timestamp suffix for uniqueness; houses imported in the same
+        # second (e.g. address-less listings in a bulk import) get a counter
+        house_id = f"{slug}-{time.strftime('%Y%m%d%H%M%S')}"
+        candidate, n = house_id, 1
+        while candidate in self._issued_ids or (self.houses_dir / f"{candidate}.json").exists():
+            n += 1
+            candidate = f"{house_id}-{n}"
+        self._issued_ids.add(candidate)
+        return candidate
 
     def normalize_address(self, address: str) -> str:
         """Normalize address for comparison."""
-        # Lowercase and remove extra whitespace
-        addr = " ".join(address.lower().split())
-        # Remove punctuation except spaces
-        addr = "".join(c if c.isalnum() or c == " " else " " for c in addr)
-        # Normalize common abbreviations
-        replacements = {
-            " st ": " street ",
-            " st$": " street",
-            " dr ": " drive ",
-            " dr$": " drive",
-            " ave ": " avenue ",
-            " ave$": " avenue",
-            " rd ": " road ",
-            " rd$": " road",
-            " ln ": " lane ",
-            " ln$": " lane",
-            " ct ": " court ",
-            " ct$": " court",
-            " cir ": " circle ",
-            " cir$": " circle",
-            " blvd ": " boulevard ",
-            " blvd$": " boulevard",
-            " pl ": " place ",
-            " pl$": " place",
-        }
-        for abbr, full in replacements.items():
-            if abbr.endswith("$"):
-                if addr.endswith(abbr[:-1]):
-                    addr = addr[:-len(abbr)+1] + full
-            else:
-                addr = addr.replace(abbr, full)
-        # Collapse multiple spaces
-        return " ".join(addr.split())
+        # Lowercase and turn punctuation (and any run of whitespace) into one space
+        addr = _NON_ALNUM_RE.sub(" ", address.lower()).strip()
+        # Expand street-type abbreviations after the first word
+        return _STREET_ABBR_RE.sub(lambda m: _STREET_ABBRS[m.group()], addr)
+
+    def _addresses(self) -> dict[str, str]:
+        """Map normalized addresses to house ids, scanning the houses once per store."""
+        if self._address_index is None:
+            # Oldest first, so duplicates resolve to the newest house as list_houses() orders them
+            self._address_index = {
+                self.normalize_address(house.address): house.id
+                for house in reversed(self.list_houses())
+            }
+        return self._address_index
+
+    def existing_addresses(self) -> set[str]:
+        """Normalized addresses of all stored houses, for bulk duplicate checks."""
+        return set(self._addresses())
 
     def house_exists(self, address: str) -> bool:
         """Check if a house with this address already exists."""
-        normalized = self.normalize_address(address)
-        for house in self.list_houses():
-            if self.normalize_address(house.address) == normalized:
-                return True
-        return False
+        return self.find_house_by_address(address) is not None
 
     def find_house_by_address(self, address: str) -> House | None:
         """Find a house by address (normalized comparison)."""
         normalized = self.normalize_address(address)
-        for house in self.list_houses():
-            if self.normalize_address(house.address) == normalized:
-                return house
-        return None
+        house_id = self._addresses().get(normalized)
+        if house_id is None:
+            return None
+
+        # An entry goes stale if the house's address was edited; rescan once
+        house = self.load_house(house_id)
+        if house is None or self.normalize_address(house.address) != normalized:
+            self._address_index = None
+            house_id = self._addresses().get(normalized)
+            house = self.load_house(house_id) if house_id else None
+        return house
 
     def bulk_save_houses(self, houses: list[House]) -> tuple[int, int]:
         """Save multiple houses, skipping duplicates.
@@ -170,21 +345,75 @@ class JsonStore:
         """
         saved = 0
         skipped = 0
+        existing = self.existing_addresses()
         for house in houses:
-            if self.house_exists(house.address):
+            normalized = self.normalize_address(house.address)
+            if normalized in existing:
                 skipped += 1
             else:
                 self.save_house(house)
+                existing.add(normalized)
                 saved += 1
         return saved, skipped
 
+    def _fit_scores(self) -> dict[str, float | None]:
+        """Fit score of every stored house by id, None for unscored houses.
+
+        The scores are kept in a sidecar stamped with each house file's
+        (mtime_ns, size), so only files changed since the last call are
+        parsed, even in a fresh process.
+        """
+        if self._score_index is None:
+            try:
+                self._score_index = orjson.loads(self.score_index_file.read_bytes())
+            except (FileNotFoundError, orjson.JSONDecodeError):
+                self._score_index = {}
+        index = self._score_index
+
+        scores = {}
+        changed = False
+        with os.scandir(self.houses_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                house_id = entry.name.removesuffix(".json")
+                stamp = self._entry_stamp(entry)
+                cached = index.get(house_id)
+                if cached is None or tuple(cached[:2]) != stamp:
+                    house = self._read_house(Path(entry.path), stamp)
+                    fit = house.present_fit_score
+                    cached = index[house_id] = [*stamp, fit.score if fit else None]
+                    changed = True
+                scores[house_id] = cached[2]
+
+        # Drop deleted houses
+        if len(index) != len(scores):
+            self._score_index = index = {house_id: index[house_id] for house_id in scores}
+            changed = True
+
+        if changed:
+            self.score_index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.score_index_file.with_name(f"{self.score_index_file.name}.tmp")
+            tmp_path.write_bytes(orjson.dumps(index))
+            os.replace(tmp_path, self.score_index_file)
+        return scores
+
+    def _read_houses(self, house_ids) -> list[House]:
+        """Read the given houses, newest first like list_houses."""
+        houses = [self._read_house(self.houses_dir / f"{house_id}.json") for house_id in house_ids]
+        return sorted(houses, key=lambda h: h.ingested_at, reverse=True)
+
     def get_unscored_houses(self) -> list[House]:
         """Get houses that haven't been scored yet."""
-        return [h for h in self.list_houses() if h.present_fit_score is None]
+        scores = self._fit_scores()
+        return self._read_houses(house_id for house_id, score in scores.items() if score is None)
 
     def get_scored_houses(self) -> list[House]:
         """Get houses that have been scored, sorted by score."""
-        scored = [h for h in self.list_houses() if h.present_fit_score is not None]
+        scores = self._fit_scores()
+        scored = self._read_houses(
+            house_id for house_id, score in scores.items() if score is not None
+        )
         return sorted(
             scored,
             key=lambda h: h.present_fit_score.score if h.present_fit_score else 0,
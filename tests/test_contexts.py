@@ -0,0 +1,72 @@
+"""Prompt contexts render cleanly when optional listing and taste fields are unset."""
+
+import pytest
+
+from src.agents.base import AgentContext
+from src.agents.brief import BriefAgent
+from src.agents.distiller import DistillerAgent
+from src.agents.potential import PotentialAgent
+from src.agents.present_fit import PresentFitAgent
+from src.models import House, PotentialScore, PresentFitScore, TasteModel, VisionAnalysis
+from src.storage import JsonStore
+
+# Source text of the conditional expressions, which must never leak into a prompt
+LEAKED_SOURCE = "else 'N/A'"
+
+
+class RecordingClient:
+    """Stands in for the OpenRouter client and keeps the prompts it was sent."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def chat(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return ""
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JsonStore(tmp_path)
+
+
+@pytest.fixture
+def ctx(store):
+    return AgentContext(store=store, openai=None, openrouter=RecordingClient())
+
+
+@pytest.fixture
+def taste():
+    taste = TasteModel.create_empty()
+    taste.renovation_budget_max = None
+    return taste
+
+
+@pytest.fixture
+def house():
+    return House(
+        id="test-house",
+        address="1 Test St",
+        price=None,
+        vision_analysis=VisionAnalysis(overall_aesthetic=6.0),
+        present_fit_score=PresentFitScore(score=50.0, passed=True),
+        potential_score=PotentialScore(score=60.0, feasibility="light", cost_class="<$50k"),
+    )
+
+
+@pytest.mark.parametrize("agent_cls", [PresentFitAgent, PotentialAgent, BriefAgent])
+def test_house_context_without_price_or_budget(ctx, house, taste, agent_cls):
+    context = agent_cls(ctx).build_context(house, taste)
+
+    assert "Price: N/A" in context
+    assert LEAKED_SOURCE not in context
+
+
+def test_distiller_context_without_budget(ctx, store, taste):
+    store.save_taste(taste)
+
+    DistillerAgent(ctx).distill()
+
+    (prompt,) = ctx.openrouter.prompts
+    assert "Max Budget: Not specified" in prompt
+    assert LEAKED_SOURCE not in prompt